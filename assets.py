@@ -0,0 +1,245 @@
+"""
+Process-wide registry of loaded images, every sprite shares the same surfaces.
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame as pg
+
+PACK_MAGIC = b'CPAK'
+PACK_VERSION = 2
+PACK_HEADER = struct.Struct('<4sII')  # magic, version, index length
+PACK_ALIGN = 16
+
+
+def scaled_key(path, size):
+    """Pack key of an image baked at a given size."""
+    return f'{path}@{int(size[0])}x{int(size[1])}'
+
+
+class FrameCursor:
+    """Position of one sprite in a shared tuple of animation frames."""
+    __slots__ = ('frames', 'index')
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    @property
+    def current(self):
+        return self.frames[self.index]
+
+    def advance(self):
+        self.index = (self.index + 1) % len(self.frames)
+        return self.frames[self.index]
+
+    def reset(self):
+        self.index = 0
+
+
+class AssetPack:
+    """Read side of the pack written by pack_assets.py. The file is memory mapped, pixels are only touched
+    when an image is converted, so opening a pack costs no more than reading its index."""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = PACK_HEADER.unpack_from(self.data)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f'{path} is not a version {PACK_VERSION} asset pack, rebuild it with pack_assets.py')
+        index = json.loads(self.data[PACK_HEADER.size:PACK_HEADER.size + index_length])
+        # key -> {offset, length, source, size} or {offset, length, source} for files, source is the
+        # [size, mtime] of the file under resources/ the entry was built from
+        self.entries = index['entries']
+        self.folders = index['folders']  # folder -> file names in the order os.listdir gave them
+        self.view = memoryview(self.data)
+        self.data_start = -(-(PACK_HEADER.size + index_length) // PACK_ALIGN) * PACK_ALIGN
+
+    def drop_stale(self):
+        """Forget entries whose source file was edited or removed since packing and folder listings that no
+        longer match the folder, those load from resources/ instead. Returns the dropped keys and folders."""
+        stamps, stale = {}, []
+        for key, entry in list(self.entries.items()):
+            path = key.partition('@')[0]  # a pre-scaled texture is stamped with its source image
+            if path not in stamps:
+                try:
+                    stat = os.stat(path)
+                    stamps[path] = [stat.st_size, stat.st_mtime_ns]
+                except OSError:
+                    stamps[path] = None
+            if entry.get('source') != stamps[path]:
+                del self.entries[key]
+                stale.append(key)
+        for folder, file_names in list(self.folders.items()):
+            try:
+                current = {name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name))}
+            except OSError:
+                current = None
+            if current != set(file_names):
+                del self.folders[folder]
+                stale.append(folder + '/')
+        return stale
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def blob(self, key):
+        entry = self.entries[key]
+        start = self.data_start + entry['offset']
+        return self.view[start:start + entry['length']]
+
+    def image(self, key):
+        # the surface borrows the mapped pixels, convert_alpha makes the copy the game keeps
+        return pg.image.frombuffer(self.blob(key), self.entries[key]['size'], 'RGBA')
+
+    def open_file(self, key):
+        return io.BytesIO(self.blob(key))
+
+
+class AssetLoader:
+    """Decodes images on a pool of worker threads. Surfaces can only be converted on the main thread, which
+    does that in pump as they finish, or right away for an image it needs before its turn."""
+    def __init__(self, registry, workers):
+        self.registry = registry
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='asset-loader')
+        self.pending = {}  # key -> future of the decoded surface, in the order queued
+        self.queued = 0
+
+    def queue(self, path, size=None):
+        key = path if size is None else scaled_key(path, size)
+        if key not in self.registry.images and key not in self.pending:
+            self.pending[key] = self.pool.submit(self.registry.decode_image, path, size)
+            self.queued += 1
+
+    def queue_folder(self, path):
+        for file_name in self.registry.list_folder(path):
+            self.queue(path + '/' + file_name)
+
+    @property
+    def progress(self):
+        return 1 - len(self.pending) / self.queued if self.queued else 1.0
+
+    def is_pending(self, path, size=None):
+        """Whether an image, or with a folder any image under it, is still queued."""
+        if size is not None:
+            return scaled_key(path, size) in self.pending
+        prefix = path + '/'
+        return path in self.pending or any(key.startswith(prefix) for key in self.pending)
+
+    def finish(self, key):
+        self.registry.images[key] = self.pending.pop(key).result().convert_alpha()
+
+    def pump(self, time_budget):
+        """Convert the images that finished decoding, for at most about time_budget ms."""
+        start = time.perf_counter()
+        for key in [key for key, future in self.pending.items() if future.done()]:
+            self.finish(key)
+            if (time.perf_counter() - start) * 1000 > time_budget:
+                break
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AssetRegistry:
+    def __init__(self):
+        self.images = {}
+        self.folders = {}
+        self.pack = None
+        self.loader = None
+
+    def open_pack(self, path):
+        """Load from the pack at path where it is still current with resources/, without it when it is not a
+        pack this version can read."""
+        try:
+            pack = AssetPack(path)
+        except ValueError as error:
+            print(f'{error}, loading from resources/', file=sys.stderr)
+            return
+        stale = pack.drop_stale()
+        if stale:
+            print(f'{path}: {len(stale)} entries changed in resources/ since packing and load from there '
+                  f'({", ".join(stale[:3])}{", ..." if len(stale) > 3 else ""}), rebuild it with pack_assets.py',
+                  file=sys.stderr)
+        self.pack = pack
+
+    def start_loading(self, workers):
+        if self.loader is None:
+            self.loader = AssetLoader(self, workers)
+        return self.loader
+
+    def pump(self, time_budget):
+        if self.loader is not None:
+            self.loader.pump(time_budget)
+            if not self.loader.pending:
+                self.loader.close()
+                self.loader = None
+
+    def is_pending(self, path, size=None):
+        return self.loader is not None and self.loader.is_pending(path, size)
+
+    def decode_image(self, path, size=None):
+        """An image, scaled to size if given, not yet converted to the display format. Safe to call from the
+        loader's worker threads."""
+        if size is not None:
+            key = scaled_key(path, size)
+            if self.pack is not None and key in self.pack:
+                return self.pack.image(key)
+            return pg.transform.scale(self.decode_image(path), size)
+        if self.pack is not None and path in self.pack:
+            return self.pack.image(path)
+        return pg.image.load(path)
+
+    def get_image(self, key, path, size=None):
+        image = self.images.get(key)
+        if image is None:
+            if self.loader is not None and key in self.loader.pending:
+                self.loader.finish(key)  # needed now, waits for a worker if it is still decoding
+            else:
+                self.images[key] = self.decode_image(path, size).convert_alpha()
+            image = self.images[key]
+        return image
+
+    def load_image(self, path):
+        return self.get_image(path, path)
+
+    def load_texture(self, path, size):
+        """An image scaled to size, baked by the packer when it was built with the current settings."""
+        return self.get_image(scaled_key(path, size), path, size)
+
+    def list_folder(self, path):
+        file_names = self.pack.folders.get(path) if self.pack is not None else None
+        if file_names is None:
+            file_names = [file_name for file_name in os.listdir(path)
+                          if os.path.isfile(os.path.join(path, file_name))]
+        return file_names
+
+    def load_folder(self, path):
+        """All images directly inside a folder, loaded once and shared as a tuple."""
+        frames = self.folders.get(path)
+        if frames is None:
+            frames = self.folders[path] = tuple(self.load_image(path + '/' + file_name)
+                                                for file_name in self.list_folder(path))
+        return frames
+
+    def open_file(self, path):
+        """A binary file object for a sound or other non-image resource."""
+        if self.pack is not None and path in self.pack:
+            return self.pack.open_file(path)
+        return open(path, 'rb')
+
+    def get_frames(self, path):
+        return FrameCursor(self.load_folder(path))
+
+
+assets = AssetRegistry()
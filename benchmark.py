@@ -0,0 +1,189 @@
+"""
+Reproducible benchmark of the frame pipeline: fixed map and seed, scripted camera paths, per-stage timings.
+
+    python benchmark.py --output base.json
+    python benchmark.py --output new.json
+    python benchmark.py --compare base.json new.json
+    python benchmark.py --startup 10
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from random import seed
+import numpy as np
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # keep stdout clean for the json
+import pygame as pg
+from settings import *
+from profiler import StageProfiler
+
+# (x, y, angle) keyframes, the camera moves between them at a constant rate
+CAMERA_PATHS = {
+    'spawn_turn': [(1.5, 5, 0), (1.5, 5, math.tau)],
+    'upper_rooms': [(1.5, 1.5, 0), (13.5, 1.5, 0), (13.5, 1.5, math.pi / 2), (13.5, 6.5, math.pi / 2),
+                    (13.5, 6.5, math.pi), (10.5, 6.5, math.pi / 2), (10.5, 12.5, math.pi / 2)],
+    'arena_turn': [(7.45, 14.43, 0), (7.45, 14.43, math.tau)],
+    'lower_hall': [(1.5, 24.5, 0), (13.5, 24.5, 0), (13.5, 24.5, math.pi / 2), (13.5, 29.5, math.pi / 2),
+                   (13.5, 29.5, math.pi), (1.5, 29.5, math.pi)],
+}
+STAGES = [
+    ('raycasting', 'ray_cast', 'RayCasting.ray_cast'),
+    ('raycasting', 'get_objects_to_render', 'RayCasting.get_objects_to_render'),
+    ('object_handler', 'update', 'ObjectHandler.update'),
+    ('object_renderer', 'draw', 'ObjectRenderer.draw'),
+    ('minimap', 'draw', 'Minimap.draw'),
+]
+PERCENTILES = 50, 95, 99
+FLAGGED = 'p50', 'p95'  # p99 of a few hundred frames is too noisy to fail a run on
+
+
+def camera_pose(keyframes, t):
+    """Pose at t in [0, 1] along the keyframes."""
+    position = t * (len(keyframes) - 1)
+    index = min(int(position), len(keyframes) - 2)
+    (x0, y0, a0), (x1, y1, a1) = keyframes[index], keyframes[index + 1]
+    f = position - index
+    return x0 + (x1 - x0) * f, y0 + (y1 - y0) * f, a0 + (a1 - a0) * f
+
+
+def summarize(samples):
+    samples = np.asarray(samples)
+    summary = {f'p{p}': float(np.percentile(samples, p)) for p in PERCENTILES}
+    summary['mean'] = float(samples.mean())
+    summary['max'] = float(samples.max())
+    return summary
+
+
+def run_path(keyframes, frames, warmup, random_seed):
+    # a fresh game per path so every path starts from the same spawn and npc state
+    from main import Game
+    seed(random_seed)
+    game = Game(headless=True)
+    profiler = StageProfiler()
+    for attr, method_name, stage in STAGES:
+        profiler.instrument(getattr(game, attr), method_name, stage)
+
+    player = game.player
+    frame_times, object_counts, stage_times = [], [], {stage: [] for *_, stage in STAGES}
+    for frame in range(warmup + frames):
+        player.x, player.y, angle = camera_pose(keyframes, frame / (warmup + frames - 1))
+        player.angle = angle % math.tau
+        player.health = PLAYER_MAX_HEALTH  # the camera never dies mid path
+
+        start = time.perf_counter()
+        game.update()
+        game.draw()
+        elapsed = (time.perf_counter() - start) * 1000
+
+        stages, _ = profiler.end_frame()
+        if frame >= warmup:
+            frame_times.append(elapsed)
+            object_counts.append(len(game.raycasting.objects_to_render))
+            for stage, times in stage_times.items():
+                times.append(stages.get(stage, 0.0))
+
+    return {
+        'frame_ms': summarize(frame_times),
+        'stages_ms': {stage: summarize(times) for stage, times in stage_times.items()},
+        'objects_to_render_mean': float(np.mean(object_counts)),
+    }
+
+
+def run(paths, frames, warmup, random_seed):
+    return {
+        'meta': {
+            'seed': random_seed, 'frames': frames, 'warmup': warmup, 'resolution': list(RES),
+            'num_rays': NUM_RAYS, 'ray_cast_engine': RAY_CAST_ENGINE, 'wall_renderer': WALL_RENDERER,
+            'python': platform.python_version(), 'pygame': pg.version.ver, 'numpy': np.__version__,
+        },
+        'paths': {name: run_path(CAMERA_PATHS[name], frames, warmup, random_seed) for name in paths},
+    }
+
+
+def measure_startup(runs):
+    """Wall time from launching the game headless to its first rendered frame, with and without the asset
+    pack, in fresh processes so nothing is already loaded."""
+    command = [sys.executable, 'main.py', '--headless', '--ticks', '1', '--render']
+    results = {'pack_present': os.path.isfile(ASSET_PACK)}
+    for label, extra in (('pack', []), ('no_pack', ['--no-pack'])):
+        samples = []
+        for run_index in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command + extra, check=True, capture_output=True)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[f'{label}_ms'] = summarize(samples)
+    return results
+
+
+def compare(base, new, threshold, min_delta):
+    """Rows of (path, metric, base ms, new ms, change), regressions are FLAGGED percentiles slower by
+    more than threshold and by at least min_delta ms."""
+    rows, regressions = [], []
+    for name, new_path in new['paths'].items():
+        base_path = base['paths'].get(name)
+        if base_path is None:
+            continue
+        metrics = [('frame', base_path['frame_ms'], new_path['frame_ms'])]
+        metrics += [(stage, base_path['stages_ms'].get(stage), summary)
+                    for stage, summary in new_path['stages_ms'].items()]
+        for metric, base_summary, new_summary in metrics:
+            if base_summary is None:
+                continue
+            for key in ('p50', 'p95', 'p99'):
+                old, cur = base_summary[key], new_summary[key]
+                change = (cur - old) / old if old else 0.0
+                row = name, f'{metric} {key}', old, cur, change
+                rows.append(row)
+                if key in FLAGGED and change > threshold and cur - old >= min_delta:
+                    regressions.append(row)
+    return rows, regressions
+
+
+def print_comparison(rows, regressions):
+    flagged = set(regressions)
+    for name, metric, old, cur, change in rows:
+        mark = '  REGRESSION' if (name, metric, old, cur, change) in flagged else ''
+        print(f'{name:12} {metric:40} {old:8.2f} -> {cur:8.2f} ms {change:+7.1%}{mark}')
+    print(f'{len(regressions)} regression(s)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paths', default=','.join(CAMERA_PATHS), help='comma separated camera paths')
+    parser.add_argument('--frames', type=int, default=300, help='measured frames per path')
+    parser.add_argument('--warmup', type=int, default=30, help='frames per path before measuring')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the results here instead of stdout')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two result files')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown flagged by --compare')
+    parser.add_argument('--min-delta', type=float, default=0.2, help='ms a slowdown must also exceed')
+    parser.add_argument('--startup', type=int, metavar='RUNS', help='time launch to first frame instead')
+    args = parser.parse_args()
+
+    if args.startup:
+        print(json.dumps(measure_startup(args.startup), indent=2))
+        return
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        rows, regressions = compare(base, new, args.threshold, args.min_delta)
+        print_comparison(rows, regressions)
+        sys.exit(1 if regressions else 0)
+
+    results = run(args.paths.split(','), args.frames, args.warmup, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
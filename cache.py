@@ -0,0 +1,149 @@
+"""
+Bounded LRU caches and text caches used by the renderer.
+"""
+from collections import OrderedDict
+import pygame as pg
+from settings import *
+
+
+def surface_bytes(surface):
+    return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+
+class LRUCache:
+    def __init__(self, max_cost, cost=None):
+        self.max_cost = max_cost
+        self.cost = cost  # cost of one value, every entry costs 1 if not set
+        self.entries = OrderedDict()
+        self.total_cost = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.total_cost -= self.entries.pop(key)[1]
+        cost = self.cost(value) if self.cost else 1
+        self.entries[key] = value, cost
+        self.total_cost += cost
+        # always keep the newest entry, even if it alone is over the limit
+        while self.total_cost > self.max_cost and len(self.entries) > 1:
+            self.total_cost -= self.entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        self.entries.clear()
+        self.total_cost = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'cost': self.total_cost, 'max_cost': self.max_cost,
+                'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate}
+
+
+class SpriteCache:
+    """Scaled sprite images shared by every sprite, keyed by source image and rounded size."""
+    def __init__(self, max_bytes=SPRITE_CACHE_MAX_BYTES, size_step=SPRITE_SIZE_STEP):
+        self.size_step = size_step
+        # entries keep their source image alive, so its id can't be reused while cached
+        self.images = LRUCache(max_bytes, lambda entry: surface_bytes(entry[1]))
+
+    def get_scaled(self, image, width, height):
+        step = self.size_step
+        width = max(step, round(width / step) * step)
+        height = max(step, round(height / step) * step)
+        key = id(image), width, height
+        entry = self.images.get(key)
+        if entry is None:
+            entry = image, pg.transform.scale(image, (width, height))
+            self.images.put(key, entry)
+        return entry[1]
+
+    def stats(self):
+        return self.images.stats()
+
+
+sprite_cache = SpriteCache()
+
+
+class ColumnCache:
+    """Wall textures sliced into column strips once, scaled columns are kept in an LRU."""
+    def __init__(self, textures, max_bytes=COLUMN_CACHE_MAX_BYTES, height_step=COLUMN_HEIGHT_STEP):
+        self.height_step = height_step
+        self.strips = {
+            texture: [image.subsurface(column, 0, SCALE, TEXTURE_SIZE)
+                      for column in range(TEXTURE_SIZE - SCALE + 1)]
+            for texture, image in textures.items()
+        }
+        self.columns = LRUCache(max_bytes, surface_bytes)
+
+    def get_column(self, texture, offset, proj_height):
+        """Return the scaled column for a ray hit and the y it should be drawn at."""
+        column = int(offset * (TEXTURE_SIZE - SCALE))
+        height = max(self.height_step, round(proj_height / self.height_step) * self.height_step)
+        key = texture, column, height
+        wall_column = self.columns.get(key)
+        if wall_column is None:
+            wall_column = self.scale_column(self.strips[texture][column], height)
+            self.columns.put(key, wall_column)
+        if height < HEIGHT:
+            return wall_column, HALF_HEIGHT - height // 2
+        return wall_column, 0
+
+    @staticmethod
+    def scale_column(strip, height):
+        if height < HEIGHT:
+            return pg.transform.scale(strip, (SCALE, height))
+        texture_height = TEXTURE_SIZE * HEIGHT / height
+        strip = strip.subsurface(0, HALF_TEXTURE_SIZE - texture_height // 2, SCALE, texture_height)
+        return pg.transform.scale(strip, (SCALE, HEIGHT))
+
+    def stats(self):
+        return self.columns.stats()
+
+
+class FontRegistry:
+    """System fonts looked up once per (name, size, bold) and shared."""
+    def __init__(self):
+        self.fonts = {}
+
+    def get(self, name, size, bold=False):
+        key = name, size, bold
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = pg.font.SysFont(name, size, bold=bold)
+        return font
+
+
+fonts = FontRegistry()
+
+
+class TextCache:
+    """Rendered HUD labels by slot, a label is rendered again only when its text or color changes."""
+    def __init__(self):
+        self.labels = {}
+        self.renders = 0
+
+    def render(self, slot, font, text, color):
+        entry = self.labels.get(slot)
+        if entry is None or entry[0] != text or entry[1] != color:
+            entry = self.labels[slot] = text, color, font.render(text, True, color)
+            self.renders += 1
+        return entry[2]
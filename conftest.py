@@ -0,0 +1,38 @@
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import random
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='session')
+def game():
+    # resource paths are relative to the repo root
+    os.chdir(ROOT)
+    from main import Game
+    return Game(headless=True)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(1)
+
+
+@pytest.fixture
+def free_tiles(game):
+    return [(x, y) for y, row in enumerate(game.map.mini_map) for x, tile in enumerate(row) if not tile]
+
+
+@pytest.fixture
+def place_player(game, rng, free_tiles):
+    """Callable putting the player, simulated and interpolated pose alike, at a random spot on a free tile."""
+    def place():
+        player = game.player
+        x, y = rng.choice(free_tiles)
+        player.x = player.view_x = x + rng.random()
+        player.y = player.view_y = y + rng.random()
+        player.angle = player.view_angle = rng.random() * 6.283185307179586
+    return place
@@ -0,0 +1,66 @@
+"""
+Input sources for the player, live keyboard and mouse or a script played back tick by tick.
+"""
+import pygame as pg
+from settings import *
+
+
+class LiveInput:
+    def advance(self):
+        pass
+
+    def get_events(self):
+        return pg.event.get()
+
+    def get_pressed(self):
+        return pg.key.get_pressed()
+
+    def get_mouse_rel(self):
+        mx, my = pg.mouse.get_pos()
+        if mx < MOUSE_BORDER_LEFT or mx > MOUSE_BORDER_RIGHT:
+            pg.mouse.set_pos([HALF_WIDTH, HALF_HEIGHT])
+        return pg.mouse.get_rel()[0]
+
+
+class KeyState:
+    """Stands in for pg.key.get_pressed(), indexed by key code."""
+    def __init__(self, keys=()):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class ScriptedInput:
+    """Input played back from a script, one step per simulation tick.
+
+    A step is a dict with any of 'keys' (held keys), 'press' (keys pressed this tick), 'mouse_rel'
+    (horizontal mouse motion) and 'shoot'. Keys are pygame key codes or names such as 'w' or 'left shift'.
+    Once the script runs out no input is given.
+    """
+    def __init__(self, script=()):
+        self.script = iter(script)
+        self.keys = KeyState()
+        self.mouse_rel = 0
+        self.events = []
+
+    @staticmethod
+    def key_code(key):
+        return pg.key.key_code(key) if isinstance(key, str) else key
+
+    def advance(self):
+        step = next(self.script, None) or {}
+        self.keys = KeyState(self.key_code(key) for key in step.get('keys', ()))
+        self.mouse_rel = step.get('mouse_rel', 0)
+        self.events = [pg.event.Event(pg.KEYDOWN, key=self.key_code(key)) for key in step.get('press', ())]
+        if step.get('shoot'):
+            self.events.append(pg.event.Event(pg.MOUSEBUTTONDOWN, button=1, pos=(HALF_WIDTH, HALF_HEIGHT)))
+
+    def get_events(self):
+        return self.events
+
+    def get_pressed(self):
+        return self.keys
+
+    def get_mouse_rel(self):
+        return self.mouse_rel
@@ -0,0 +1,80 @@
+"""
+Start-up asset streaming: images decode on a worker pool behind a progress screen, the game starts once the
+first area is ready and the npc sprites keep streaming in while it runs.
+"""
+import sys
+import pygame as pg
+from settings import *
+from cache import fonts
+
+# (path, size) of every texture ObjectRenderer scales at load
+SCALED_TEXTURES = [
+    *((f'resources/textures/{i}.png', (TEXTURE_SIZE, TEXTURE_SIZE)) for i in range(1, 6)),
+    ('resources/textures/sky.png', (WIDTH, HALF_HEIGHT)),
+    ('resources/textures/blood_screen.png', RES),
+    ('resources/textures/game_over.png', RES),
+    ('resources/textures/win.png', RES),
+    *((f'resources/textures/digits/{i}.png', (90, 90)) for i in range(11)),
+    *((f'resources/sprites/player/{name}.png', (96, 96)) for name in ('idle', 'walk', 'run', 'shoot')),
+]
+# the rest of what can be seen from the spawn: the weapon and the decorations
+FIRST_AREA_FOLDERS = [
+    'resources/sprites/weapon/shotgun',
+    'resources/sprites/static_sprites',
+    'resources/sprites/animated_sprites/green_light',
+    'resources/sprites/animated_sprites/red_light',
+]
+# npc never spawn next to the player, so their sprites load after the game has started
+NPC_FOLDERS = [
+    'resources/sprites/npc/soldier',
+    'resources/sprites/npc/caco_demon',
+    'resources/sprites/npc/cyber_demon',
+]
+NPC_ANIMATIONS = 'attack', 'death', 'idle', 'pain', 'walk'
+
+
+def queue_assets(loader):
+    """Queue every image in the order it is needed, already loaded ones are skipped."""
+    for path, size in SCALED_TEXTURES:
+        loader.queue(path, size)
+    for folder in FIRST_AREA_FOLDERS:
+        loader.queue_folder(folder)
+    for folder in NPC_FOLDERS:
+        loader.queue_folder(folder)
+        for animation in NPC_ANIMATIONS:
+            loader.queue_folder(folder + '/' + animation)
+
+
+def first_area_ready(loader):
+    return not (any(loader.is_pending(path, size) for path, size in SCALED_TEXTURES) or
+                any(loader.is_pending(folder) for folder in FIRST_AREA_FOLDERS))
+
+
+class LoadingScreen:
+    def __init__(self, game):
+        self.game = game
+        self.screen = game.screen
+        self.font = fonts.get('consolas', 26)
+        self.bar = pg.Rect(0, 0, WIDTH // 3, 24)
+        self.bar.center = HALF_WIDTH, HALF_HEIGHT
+
+    def run(self, loader):
+        """Convert images as the workers finish them until the first area is ready."""
+        while not first_area_ready(loader):
+            for event in pg.event.get():
+                if event.type == pg.QUIT:
+                    pg.quit()
+                    sys.exit()
+            loader.pump(LOADING_CONVERT_BUDGET)
+            self.draw(loader.progress)
+            pg.display.flip()
+            self.game.clock.tick(60)
+
+    def draw(self, progress):
+        self.screen.fill('black')
+        label = self.font.render(f'LOADING {progress:.0%}', True, LOADING_BAR_COLOR)
+        self.screen.blit(label, label.get_rect(midbottom=(HALF_WIDTH, self.bar.top - 10)))
+        pg.draw.rect(self.screen, LOADING_BAR_COLOR, self.bar, 2)
+        filled = self.bar.inflate(-8, -8)
+        filled.width = int(filled.width * progress)
+        pg.draw.rect(self.screen, LOADING_BAR_COLOR, filled)
@@ -1,6 +1,11 @@
 
 import pygame as pg
+import argparse
+import json
+import os
+from random import seed
 import sys
+import time
 from settings import *
 from map import *
 from player import *
@@ -12,22 +17,44 @@ from weapon_manager import *
 from sound import *
 from pathfinding import *
 from minimap import *
+from controls import *
+from profiler_overlay import *
+from assets import assets
+from loading import LoadingScreen, queue_assets
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False, input_source=None, use_pack=True, wave_mode=WAVE_MODE):
+        self.headless = headless
+        self.wave_mode = wave_mode
+        if headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
         pg.init()
-        pg.mouse.set_visible(False)
-        self.screen = pg.display.set_mode(RES)
-        pg.event.set_grab(True)
+        if headless:
+            # images still need a display to convert to, the frame itself goes to an off-screen surface
+            pg.display.set_mode((1, 1))
+            self.screen = pg.Surface(RES)
+        else:
+            pg.mouse.set_visible(False)
+            self.screen = pg.display.set_mode(RES)
+            pg.event.set_grab(True)
+        if use_pack and assets.pack is None and os.path.isfile(ASSET_PACK):
+            assets.open_pack(ASSET_PACK)
+        self.input = input_source or (ScriptedInput() if headless else LiveInput())
         self.clock = pg.time.Clock()
-        self.delta_time = 1
+        # the simulation always advances in fixed steps of SIM_DT ms of game time
+        self.delta_time = SIM_DT
+        self.sim_time = 0
         self.global_trigger = False
-        self.global_event = pg.USEREVENT + 0
-        pg.time.set_timer(self.global_event, 40)
+        # set by a death or a win during a tick, the restart happens once the tick is over
+        self.restart_pending = False
+        self.overlay = ProfilerOverlay(self)
         self.new_game()
 
     def new_game(self):
+        if not self.headless:
+            self.load_assets()
         self.map = Map(self)
         self.player = Player(self)
         self.object_renderer = ObjectRenderer(self)
@@ -35,37 +62,68 @@ class Game:
         self.object_handler = ObjectHandler(self)
         self.weapon_manager = WeaponManager(self)
         self.weapon = self.weapon_manager.current_weapon  # For compatibility
-        self.sound = Sound(self)
+        self.sound = NullSound(self) if self.headless else Sound(self)
         self.pathfinding = PathFinding(self)
         self.minimap = Minimap(self)
-        pg.mixer.music.play(-1)
+        self.sound.play_theme()
+        self.overlay.refresh()
+
+    def restart(self):
+        """Start over after a win or a death. The map, the renderer and its textures, the sound, the
+        pathfinding graph and the minimap are kept, only the player, the npc population and the weapon
+        state start fresh. Npc come back out of the ObjectHandler's pools."""
+        self.restart_pending = False
+        self.player = Player(self)
+        self.object_handler.reset()
+        self.weapon_manager.reset()
+        self.weapon = self.weapon_manager.current_weapon
+        self.object_renderer.reset()
+        self.pathfinding.reset()
+        self.sound.play_theme()
+        self.overlay.refresh()
+
+    def load_assets(self):
+        """Decode images in the background behind a loading screen until the first area is ready, the rest
+        streams in during play. A restart finds everything already loaded and goes straight on."""
+        loader = assets.start_loading(ASSET_LOAD_WORKERS)
+        queue_assets(loader)
+        LoadingScreen(self).run(loader)
 
     def update(self):
+        """Advance the simulation by one fixed tick."""
+        self.sim_time += SIM_DT
+        self.global_trigger = self.sim_time // GLOBAL_TRIGGER_TIME != (self.sim_time - SIM_DT) // GLOBAL_TRIGGER_TIME
         self.player.update()
-        self.raycasting.update()
         self.object_handler.update()
         self.weapon_manager.update()
         self.weapon = self.weapon_manager.current_weapon  # Update reference
-        pg.display.flip()
-        self.delta_time = self.clock.tick(FPS)
-        pg.display.set_caption(f'{self.clock.get_fps() :.1f}')
+        if self.restart_pending:
+            # never mid tick, npc and the scheduler may still be iterating the population being reset
+            self.restart()
 
-    def draw(self):
+    def draw(self, alpha=1.0):
+        # alpha is how far this frame is between the last tick and the next one
+        self.player.update_view(alpha)
+        self.raycasting.update()
+        self.object_handler.project_sprites(alpha)
         # self.screen.fill('black')
         self.object_renderer.draw()
         self.weapon_manager.draw()
         self.minimap.draw()
+        self.overlay.draw()
         # self.map.draw()
         # self.player.draw()
 
+    def show_end_screen(self):
+        if not self.headless:
+            pg.display.flip()
+            pg.time.delay(1500)
+
     def check_events(self):
-        self.global_trigger = False
-        for event in pg.event.get():
+        for event in self.input.get_events():
             if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
                 pg.quit()
                 sys.exit()
-            elif event.type == self.global_event:
-                self.global_trigger = True
             elif event.type == pg.KEYDOWN:
                 # Weapon switching
                 if event.key == pg.K_1:
@@ -76,15 +134,68 @@ class Game:
                     self.weapon_manager.switch_weapon(3)
                 elif event.key == pg.K_e:
                     self.player.melee_attack()
+                elif event.key == pg.K_F3:
+                    self.overlay.toggle()
             self.player.single_fire_event(event)
 
     def run(self):
+        accumulator = 0
         while True:
+            accumulator += self.clock.tick(FPS)
+            self.input.advance()
+            self.check_events()
+            assets.pump(ASSET_CONVERT_BUDGET)
+            ticks = 0
+            while accumulator >= SIM_DT:
+                if ticks == MAX_CATCH_UP_TICKS:
+                    # too far behind to catch up, drop the backlog instead of spiralling
+                    accumulator %= SIM_DT
+                    break
+                self.update()
+                accumulator -= SIM_DT
+                ticks += 1
+            self.draw(accumulator / SIM_DT)
+            pg.display.flip()
+            self.overlay.end_frame()
+            pg.display.set_caption(f'{self.clock.get_fps() :.1f}')
+
+    def run_headless(self, ticks, render=False):
+        """Step the simulation as fast as possible, drawing to the off-screen surface only if asked."""
+        for tick in range(ticks):
+            self.input.advance()
             self.check_events()
             self.update()
-            self.draw()
+            if render:
+                self.draw()
+                self.overlay.end_frame()
 
 
 if __name__ == '__main__':
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--headless', action='store_true', help='no window or audio, step the simulation')
+    parser.add_argument('--ticks', type=int, default=60 * SIM_TICK_RATE, help='ticks to run headless')
+    parser.add_argument('--render', action='store_true', help='draw every tick when headless')
+    parser.add_argument('--script', help='json list of input steps, one per tick, see ScriptedInput')
+    parser.add_argument('--seed', type=int, help='seed npc spawns and behaviour')
+    parser.add_argument('--waves', action='store_true', default=WAVE_MODE, help='endless growing npc waves')
+    parser.add_argument('--no-pack', action='store_true', help=f'decode resources/ even if {ASSET_PACK} exists')
+    args = parser.parse_args()
+    if args.seed is not None:
+        seed(args.seed)
+
+    if args.headless:
+        script = ()
+        if args.script:
+            with open(args.script) as f:
+                script = json.load(f)
+        game = Game(headless=True, input_source=ScriptedInput(script), use_pack=not args.no_pack,
+                    wave_mode=args.waves)
+        start = time.perf_counter()
+        game.run_headless(args.ticks, args.render)
+        elapsed = time.perf_counter() - start
+        print(f'{args.ticks} ticks in {elapsed:.2f} s ({args.ticks / elapsed:.0f} ticks/s), '
+              f'health {game.player.health}, kills {game.player.kills}'
+              + (f', wave {game.object_handler.wave}, npc {len(game.object_handler.npc_list)}' if args.waves else ''))
+    else:
+        game = Game(use_pack=not args.no_pack, wave_mode=args.waves)
+        game.run()
@@ -1,4 +1,5 @@
 import pygame as pg
+import numpy as np
 
 _ = False
 mini_map = [
@@ -41,17 +42,46 @@ class Map:
     def __init__(self, game):
         self.game = game
         self.mini_map = mini_map
-        self.world_map = {}
         self.rows = len(self.mini_map)
         self.cols = len(self.mini_map[0])
+        # row-major tile ids, 0 is empty space
+        self.grid = bytearray(self.rows * self.cols)
         self.get_map()
+        # numpy view over the same memory, indexed [y, x]
+        self.grid_array = np.frombuffer(self.grid, dtype=np.uint8).reshape(self.rows, self.cols)
 
     def get_map(self):
         for j, row in enumerate(self.mini_map):
             for i, value in enumerate(row):
                 if value:
-                    self.world_map[(i, j)] = value
+                    self.grid[j * self.cols + i] = value
+
+    def tile_at(self, x, y):
+        """Tile id at (x, y), tiles outside the map are empty."""
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            return self.grid[y * self.cols + x]
+        return 0
+
+    def is_wall(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows and self.grid[y * self.cols + x] != 0
+
+    def walls_at(self, x, y):
+        """Vectorized is_wall for integer tile arrays."""
+        inside = (x >= 0) & (x < self.cols) & (y >= 0) & (y < self.rows)
+        walls = np.zeros(x.shape, dtype=bool)
+        walls[inside] = self.grid_array[y[inside], x[inside]] != 0
+        return walls
+
+    def wall_tiles(self):
+        for index, value in enumerate(self.grid):
+            if value:
+                yield index % self.cols, index // self.cols
+
+    def free_tiles(self):
+        for index, value in enumerate(self.grid):
+            if not value:
+                yield index % self.cols, index // self.cols
 
     def draw(self):
         [pg.draw.rect(self.game.screen, 'darkgray', (pos[0] * 100, pos[1] * 100, 100, 100), 2)
-         for pos in self.world_map]
\ No newline at end of file
+         for pos in self.wall_tiles()]
\ No newline at end of file
@@ -17,27 +17,37 @@ class Minimap:
         self.player_color = (0, 255, 0)
         self.enemy_color = (255, 0, 0)
         self.surface = pg.Surface((self.size, self.size), pg.SRCALPHA)
+        self.wall_layer = None
+        self.build_wall_layer()
+
+    def build_wall_layer(self):
+        """Draw every wall of the map once, call again whenever the map changes."""
+        game_map = self.game.map
+        self.wall_layer = pg.Surface((game_map.cols * self.scale, game_map.rows * self.scale), pg.SRCALPHA)
+        for (x, y) in game_map.wall_tiles():
+            pg.draw.rect(self.wall_layer, self.wall_color, (x * self.scale, y * self.scale, self.scale, self.scale))
     
     def draw(self):
         self.surface.fill(self.bg_color)
+        half_tiles = self.size // self.scale // 2
+        origin_x, origin_y = self.game.player.view_x, self.game.player.view_y
         
-        # Draw walls
-        for (x, y) in self.game.map.world_map:
-            map_x = int((x - self.game.player.x + self.size // self.scale // 2) * self.scale)
-            map_y = int((y - self.game.player.y + self.size // self.scale // 2) * self.scale)
-            if 0 <= map_x < self.size and 0 <= map_y < self.size:
-                pg.draw.rect(self.surface, self.wall_color, (map_x, map_y, self.scale, self.scale))
+        # Draw walls, the part of the prebuilt layer around the player, clipped by the surface
+        self.surface.blit(self.wall_layer, (int((half_tiles - origin_x) * self.scale),
+                                            int((half_tiles - origin_y) * self.scale)))
         
-        # Draw enemies ONLY (not decorative sprites)
-        for npc in self.game.object_handler.npc_list:
-            if npc.alive:
-                map_x = int((npc.x - self.game.player.x + self.size // self.scale // 2) * self.scale)
-                map_y = int((npc.y - self.game.player.y + self.size // self.scale // 2) * self.scale)
-                if 0 <= map_x < self.size and 0 <= map_y < self.size:
-                    # Draw larger red dot for enemies
-                    pg.draw.circle(self.surface, self.enemy_color, (map_x, map_y), 5)
-                    # Add red outline for visibility
-                    pg.draw.circle(self.surface, (255, 100, 100), (map_x, map_y), 5, 1)
+        # Draw enemies ONLY (not decorative sprites), the npc index only holds alive ones
+        npcs = self.game.object_handler.npc_index.query_rect(
+            origin_x - half_tiles, origin_y - half_tiles,
+            origin_x - half_tiles + self.size / self.scale, origin_y - half_tiles + self.size / self.scale)
+        for npc in npcs:
+            map_x = int((npc.x - origin_x + half_tiles) * self.scale)
+            map_y = int((npc.y - origin_y + half_tiles) * self.scale)
+            if 0 <= map_x < self.size and 0 <= map_y < self.size:
+                # Draw larger red dot for enemies
+                pg.draw.circle(self.surface, self.enemy_color, (map_x, map_y), 5)
+                # Add red outline for visibility
+                pg.draw.circle(self.surface, (255, 100, 100), (map_x, map_y), 5, 1)
         
         # Draw player (center) - larger and more visible
         player_x = self.size // 2
@@ -49,8 +59,8 @@ class Minimap:
         
         # Draw player direction line - thicker and brighter
         dir_len = 20
-        end_x = player_x + int(math.cos(self.game.player.angle) * dir_len)
-        end_y = player_y + int(math.sin(self.game.player.angle) * dir_len)
+        end_x = player_x + int(math.cos(self.game.player.view_angle) * dir_len)
+        end_y = player_y + int(math.sin(self.game.player.view_angle) * dir_len)
         pg.draw.line(self.surface, (255, 255, 255), (player_x, player_y), (end_x, end_y), 3)
         
         # Border
@@ -1,8 +1,14 @@
 from sprite_object import *
+from npc_state import state_fields
 from random import randint, random
 
 
+@state_fields
 class NPC(AnimatedSprite):
+    # world state lives in the ObjectHandler's NPCState once the npc is added, the npc is a view of its row
+    state = None
+    index = None
+
     def __init__(self, game, path='resources/sprites/npc/soldier/0.png', pos=(10.5, 5.5),
                  scale=0.6, shift=0.38, animation_time=180):
         super().__init__(game, path, pos, scale, shift, animation_time)
@@ -11,7 +17,17 @@ class NPC(AnimatedSprite):
         self.idle_images = self.get_images(self.path + '/idle')
         self.pain_images = self.get_images(self.path + '/pain')
         self.walk_images = self.get_images(self.path + '/walk')
-
+        self.reset(pos)
+
+    def reset(self, pos):
+        """Back to a fresh npc standing at pos, for npc spawned again from the ObjectHandler's pools."""
+        self.x, self.y = pos
+        for images in (self.images, self.attack_images, self.death_images, self.idle_images,
+                       self.pain_images, self.walk_images):
+            images.reset()
+        self.image = self.images.current
+        self.animation_time_prev = self.game.sim_time
+        self.animation_trigger = False
         self.attack_dist = randint(3, 6)
         self.speed = 0.02  # Slower movement
         self.size = 20
@@ -27,30 +43,22 @@ class NPC(AnimatedSprite):
         self.knockback_y = 0
 
     def update(self):
-        self.check_animation_time()
         self.get_sprite()
-        self.run_logic()
+        self.tick()
         # self.draw_ray_cast()
 
-    def check_wall(self, x, y):
-        return (x, y) not in self.game.map.world_map
-
-    def check_wall_collision(self, dx, dy):
-        if self.check_wall(int(self.x + dx * self.size), int(self.y)):
-            self.x += dx
-        if self.check_wall(int(self.x), int(self.y + dy * self.size)):
-            self.y += dy
+    def tick(self):
+        self.check_animation_time()
+        self.run_logic()
 
     def movement(self):
-        next_pos = self.game.pathfinding.get_path(self.map_pos, self.game.player.map_pos)
+        next_pos = self.game.pathfinding.get_next_step(self.map_pos, self.game.player.map_pos)
         next_x, next_y = next_pos
 
         # pg.draw.rect(self.game.screen, 'blue', (100 * next_x, 100 * next_y, 100, 100))
         if next_pos not in self.game.object_handler.npc_positions:
-            angle = math.atan2(next_y + 0.5 - self.y, next_x + 0.5 - self.x)
-            dx = math.cos(angle) * self.speed
-            dy = math.sin(angle) * self.speed
-            self.check_wall_collision(dx, dy)
+            # the step is taken for every moving npc at once by NPCState.move
+            self.state.move_towards(self.index, next_pos)
 
     def attack(self):
         if self.animation_trigger:
@@ -61,8 +69,7 @@ class NPC(AnimatedSprite):
     def animate_death(self):
         if not self.alive:
             if self.game.global_trigger and self.frame_counter < len(self.death_images) - 1:
-                self.death_images.rotate(-1)
-                self.image = self.death_images[0]
+                self.image = self.death_images.advance()
                 self.frame_counter += 1
 
     def animate_pain(self):
@@ -82,6 +89,7 @@ class NPC(AnimatedSprite):
     def check_health(self):
         if self.health < 1:
             self.alive = False
+            self.game.object_handler.npc_index.remove(self)
             self.game.sound.npc_death.play()
             self.game.player.kills += 1  # Increment kill counter
             # Health drops on kill
@@ -94,7 +102,7 @@ class NPC(AnimatedSprite):
 
     def run_logic(self):
         if self.alive:
-            self.ray_cast_value = self.ray_cast_player_npc()
+            # ray_cast_value is set for this tick by ObjectHandler.update_line_of_sight
             self.check_hit_in_npc()
 
             if self.pain:
@@ -134,73 +142,9 @@ class NPC(AnimatedSprite):
     def map_pos(self):
         return int(self.x), int(self.y)
 
-    def ray_cast_player_npc(self):
-        if self.game.player.map_pos == self.map_pos:
-            return True
-
-        wall_dist_v, wall_dist_h = 0, 0
-        player_dist_v, player_dist_h = 0, 0
-
-        ox, oy = self.game.player.pos
-        x_map, y_map = self.game.player.map_pos
-
-        ray_angle = self.theta
-
-        sin_a = math.sin(ray_angle)
-        cos_a = math.cos(ray_angle)
-
-        # horizontals
-        y_hor, dy = (y_map + 1, 1) if sin_a > 0 else (y_map - 1e-6, -1)
-
-        depth_hor = (y_hor - oy) / sin_a
-        x_hor = ox + depth_hor * cos_a
-
-        delta_depth = dy / sin_a
-        dx = delta_depth * cos_a
-
-        for i in range(MAX_DEPTH):
-            tile_hor = int(x_hor), int(y_hor)
-            if tile_hor == self.map_pos:
-                player_dist_h = depth_hor
-                break
-            if tile_hor in self.game.map.world_map:
-                wall_dist_h = depth_hor
-                break
-            x_hor += dx
-            y_hor += dy
-            depth_hor += delta_depth
-
-        # verticals
-        x_vert, dx = (x_map + 1, 1) if cos_a > 0 else (x_map - 1e-6, -1)
-
-        depth_vert = (x_vert - ox) / cos_a
-        y_vert = oy + depth_vert * sin_a
-
-        delta_depth = dx / cos_a
-        dy = delta_depth * sin_a
-
-        for i in range(MAX_DEPTH):
-            tile_vert = int(x_vert), int(y_vert)
-            if tile_vert == self.map_pos:
-                player_dist_v = depth_vert
-                break
-            if tile_vert in self.game.map.world_map:
-                wall_dist_v = depth_vert
-                break
-            x_vert += dx
-            y_vert += dy
-            depth_vert += delta_depth
-
-        player_dist = max(player_dist_v, player_dist_h)
-        wall_dist = max(wall_dist_v, wall_dist_h)
-
-        if 0 < player_dist < wall_dist or not wall_dist:
-            return True
-        return False
-
     def draw_ray_cast(self):
         pg.draw.circle(self.game.screen, 'red', (100 * self.x, 100 * self.y), 15)
-        if self.ray_cast_player_npc():
+        if self.ray_cast_value:
             pg.draw.line(self.game.screen, 'orange', (100 * self.game.player.x, 100 * self.game.player.y),
                          (100 * self.x, 100 * self.y), 2)
 
@@ -214,6 +158,9 @@ class CacoDemonNPC(NPC):
     def __init__(self, game, path='resources/sprites/npc/caco_demon/0.png', pos=(10.5, 6.5),
                  scale=0.7, shift=0.27, animation_time=250):
         super().__init__(game, path, pos, scale, shift, animation_time)
+
+    def reset(self, pos):
+        super().reset(pos)
         self.attack_dist = 1.0
         self.health = 70  # Easier to kill
         self.attack_damage = 7  # Less damage
@@ -227,6 +174,9 @@ class CyberDemonNPC(NPC):
     def __init__(self, game, path='resources/sprites/npc/cyber_demon/0.png', pos=(11.5, 6.0),
                  scale=1.0, shift=0.04, animation_time=210):
         super().__init__(game, path, pos, scale, shift, animation_time)
+
+    def reset(self, pos):
+        super().reset(pos)
         self.attack_dist = 6
         self.health = 150  # Much easier to kill
         self.attack_damage = 10  # Less damage
@@ -237,22 +187,17 @@ class CyberDemonNPC(NPC):
         return 20  # Big enemy gives 20 health
 
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+class Corpse(SpriteObject):
+    """The last death frame of an npc, drawn where it fell once the npc itself is back in its pool."""
+    def __init__(self, game, npc):
+        super().__init__(game, npc.path + '/0.png', (npc.x, npc.y), npc.SPRITE_SCALE, npc.SPRITE_HEIGHT_SHIFT)
+        self.reset(npc)
+
+    def reset(self, npc):
+        self.x, self.y = float(npc.x), float(npc.y)
+        self.image = npc.image
+        # drawn at the npc's proportions, like its death frames were
+        self.IMAGE_HALF_WIDTH = int(npc.IMAGE_HALF_WIDTH)
+        self.IMAGE_RATIO = npc.IMAGE_RATIO
+        self.SPRITE_SCALE = npc.SPRITE_SCALE
+        self.SPRITE_HEIGHT_SHIFT = npc.SPRITE_HEIGHT_SHIFT
@@ -0,0 +1,177 @@
+"""
+Packed npc world state, one row per npc in numpy arrays held by the ObjectHandler.
+"""
+import math
+import numpy as np
+from settings import *
+
+
+class StateField:
+    """Npc attribute kept in a column of its NPCState once the npc has been added to one."""
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, npc, owner=None):
+        if npc is None:
+            return self
+        try:
+            return npc.state.columns[self.name][npc.index]
+        except AttributeError:
+            # not added to a state yet, state is None
+            try:
+                return npc.__dict__[self.name]
+            except KeyError:
+                raise AttributeError(self.name) from None
+
+    def __set__(self, npc, value):
+        state = npc.state
+        if state is None:
+            npc.__dict__[self.name] = value
+        else:
+            state.columns[self.name][npc.index] = value
+
+
+def state_fields(cls):
+    """Class decorator adding a StateField for every NPCState column."""
+    for name in NPCState.fields:
+        field = StateField()
+        field.__set_name__(cls, name)
+        setattr(cls, name, field)
+    return cls
+
+
+class NPCState:
+    fields = {
+        'x': np.float64, 'y': np.float64,
+        'dx': np.float64, 'dy': np.float64, 'theta': np.float64, 'screen_x': np.float64,
+        'dist': np.float64, 'norm_dist': np.float64, 'IMAGE_HALF_WIDTH': np.int64,
+        'health': np.float64, 'alive': np.bool_, 'pain': np.bool_, 'speed': np.float64,
+        'size': np.float64, 'attack_dist': np.float64, 'ray_cast_value': np.bool_,
+        'player_search_trigger': np.bool_, 'frame_counter': np.int64,
+        'animation_time': np.float64, 'animation_time_prev': np.float64, 'animation_trigger': np.bool_,
+        'sprite_half_width': np.int64,
+    }
+    # columns with no npc attribute behind them
+    internal_fields = {
+        'last_death_frame': np.int64, 'moving': np.bool_, 'target_x': np.float64, 'target_y': np.float64,
+        'prev_x': np.float64, 'prev_y': np.float64, 'sprite_width': np.float64,
+    }
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.capacity = capacity
+        self.npcs = []
+        self.columns = {name: np.zeros(capacity, dtype) for name, dtype in
+                        {**self.fields, **self.internal_fields}.items()}
+
+    def __len__(self):
+        return self.count
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['columns'][name][:self.__dict__['count']]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def grow(self):
+        self.capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(self.capacity, column.dtype)
+            grown[:self.count] = column
+            self.columns[name] = grown
+
+    def add(self, npc):
+        """Move the npc's attributes into a new row, the npc reads and writes them from there on."""
+        if self.count == self.capacity:
+            self.grow()
+        index = self.count
+        for name in self.fields:
+            self.columns[name][index] = npc.__dict__.pop(name)
+        self.columns['last_death_frame'][index] = len(npc.death_images) - 1
+        self.columns['moving'][index] = False
+        self.columns['prev_x'][index] = self.columns['x'][index]
+        self.columns['prev_y'][index] = self.columns['y'][index]
+        # projected sprite width at distance 1, the same for every frame of the npc
+        self.columns['sprite_width'][index] = SCREEN_DIST * npc.SPRITE_SCALE * npc.IMAGE_RATIO
+        npc.state, npc.index = self, index
+        self.npcs.append(npc)
+        self.count += 1
+
+    def remove(self, npc):
+        """Hand the npc its attributes back and fill its row with the last one."""
+        columns, index, last = self.columns, npc.index, self.count - 1
+        for name in self.fields:
+            npc.__dict__[name] = columns[name][index].item()
+        if index != last:
+            for column in columns.values():
+                column[index] = column[last]
+            moved = self.npcs[index] = self.npcs[last]
+            moved.index = index
+        self.npcs.pop()
+        self.count -= 1
+        npc.state, npc.index = None, None
+
+    def store_positions(self):
+        """Remember where every npc was before this tick moves them."""
+        self.prev_x[:] = self.x
+        self.prev_y[:] = self.y
+
+    def project(self, origin_x, origin_y, angle, alpha=None):
+        """SpriteObject.get_sprite for every npc at once, returns the rows that are in view.
+        With alpha the npc are placed that far between their previous and current tick positions."""
+        x, y = self.x, self.y
+        if alpha is not None:
+            x = self.prev_x + (x - self.prev_x) * alpha
+            y = self.prev_y + (y - self.prev_y) * alpha
+        dx = np.subtract(x, origin_x, out=self.dx)
+        dy = np.subtract(y, origin_y, out=self.dy)
+        theta = np.arctan2(dy, dx, out=self.theta)
+
+        delta = theta - angle
+        if angle > math.pi:
+            delta[(dx > 0) | ((dx < 0) & (dy < 0))] += math.tau
+        else:
+            delta[(dx < 0) & (dy < 0)] += math.tau
+
+        screen_x = self.screen_x
+        screen_x[:] = (HALF_NUM_RAYS + delta / DELTA_ANGLE) * SCALE
+        dist = np.hypot(dx, dy, out=self.dist)
+        norm_dist = np.multiply(dist, np.cos(delta), out=self.norm_dist)
+        half_width = self.IMAGE_HALF_WIDTH
+        visible = (-half_width < screen_x) & (screen_x < WIDTH + half_width) & (norm_dist > 0.5)
+
+        # the half width get_sprite_projection draws at, rounded like the sprite cache rounds it, so hit
+        # checks work in ticks that are never drawn
+        width = self.sprite_width / np.where(visible, norm_dist, 1) / SPRITE_SIZE_STEP
+        width = np.maximum(SPRITE_SIZE_STEP, np.round(width) * SPRITE_SIZE_STEP)
+        self.sprite_half_width[:] = np.where(visible, width // 2, 0)
+        return np.flatnonzero(visible)
+
+    def check_animation_time(self, rows, time_now):
+        """AnimatedSprite.check_animation_time for the given rows."""
+        trigger = time_now - self.animation_time_prev[rows] > self.animation_time[rows]
+        self.animation_trigger[rows] = trigger
+        self.animation_time_prev[rows[trigger]] = time_now
+
+    def move_towards(self, index, next_pos):
+        columns = self.columns
+        columns['target_x'][index], columns['target_y'][index] = next_pos
+        columns['moving'][index] = True
+
+    def move(self, world_map):
+        """Take one step towards the queued tile for every npc that asked to move, returns their rows."""
+        rows = np.flatnonzero(self.moving)
+        if not len(rows):
+            return rows
+        self.moving[rows] = False
+        x, y = self.x[rows], self.y[rows]
+        speed, size = self.speed[rows], self.size[rows]
+        angle = np.arctan2(self.target_y[rows] + 0.5 - y, self.target_x[rows] + 0.5 - x)
+        dx = np.cos(angle) * speed
+        dy = np.sin(angle) * speed
+
+        # same wall checks as Player.check_wall_collision, x first then y from the new x
+        x = np.where(world_map.walls_at((x + dx * size).astype(int), y.astype(int)), x, x + dx)
+        y = np.where(world_map.walls_at(x.astype(int), (y + dy * size).astype(int)), y, y + dy)
+        self.x[rows], self.y[rows] = x, y
+        return rows
@@ -1,25 +1,49 @@
 from sprite_object import *
 from npc import *
-from random import choices, randrange
+from spatial_hash import SpatialHash
+from scheduler import AIScheduler
+from npc_state import NPCState
+import time
+from collections import deque
+from random import choice, choices
+from assets import assets
+import numpy as np
 
 
 class ObjectHandler:
     def __init__(self, game):
         self.game = game
         self.sprite_list = []
-        self.npc_list = []
+        # npc whose death animation has finished, packed down to a sprite so the npc can be reused
+        self.corpses = deque()
         self.npc_sprite_path = 'resources/sprites/npc/'
         self.static_sprite_path = 'resources/sprites/static_sprites/'
         self.anim_sprite_path = 'resources/sprites/animated_sprites/'
         add_sprite = self.add_sprite
         add_npc = self.add_npc
-        self.npc_positions = {}
+        self.npc_positions = set()
+        self.npc_state = NPCState()
+        # tile sized grids, npc are re-filed as they cross tiles and dropped when they die
+        self.npc_index = SpatialHash()
+        self.pickup_index = SpatialHash()
+        self.ai_scheduler = AIScheduler(game)
 
         # spawn npc
         self.enemies = 20  # Keep full enemy count
         self.npc_types = [SoldierNPC, CacoDemonNPC, CyberDemonNPC]
         self.weights = [70, 20, 10]
+        self.npc_folders = {SoldierNPC: self.npc_sprite_path + 'soldier',
+                            CacoDemonNPC: self.npc_sprite_path + 'caco_demon',
+                            CyberDemonNPC: self.npc_sprite_path + 'cyber_demon'}
+        self.waiting_npc = []  # (npc type, pos) spawned before the type's sprites finished loading
+        # released npc and corpses, spawning takes from here before building new ones
+        self.npc_pool = {npc_type: [] for npc_type in self.npc_types}
+        self.corpse_pool = []
         self.restricted_area = {(i, j) for i in range(10) for j in range(10)}
+        # every tile npc may spawn on, drawn from directly instead of retrying random tiles until one is free
+        self.spawn_tiles = [tile for tile in game.map.free_tiles() if tile not in self.restricted_area]
+        self.wave = 0
+        self.spawn_queue = deque()  # npc types of the current wave still to be placed
         self.spawn_npc()
 
         # sprite map
@@ -57,28 +81,142 @@ class ObjectHandler:
         # add_npc(CyberDemonNPC(game, pos=(14.5, 25.5)))
 
     def spawn_npc(self):
+        if self.game.wave_mode:
+            self.next_wave()
+            return
         for i in range(self.enemies):
-                npc = choices(self.npc_types, self.weights)[0]
-                pos = x, y = randrange(self.game.map.cols), randrange(self.game.map.rows)
-                while (pos in self.game.map.world_map) or (pos in self.restricted_area):
-                    pos = x, y = randrange(self.game.map.cols), randrange(self.game.map.rows)
-                self.add_npc(npc(self.game, pos=(x + 0.5, y + 0.5)))
+            npc = choices(self.npc_types, self.weights)[0]
+            x, y = choice(self.spawn_tiles)
+            self.spawn(npc, (x + 0.5, y + 0.5))
+
+    def next_wave(self):
+        self.wave += 1
+        size = round(WAVE_FIRST_SIZE * WAVE_GROWTH ** (self.wave - 1))
+        self.spawn_queue.extend(choices(self.npc_types, self.weights, k=size))
+
+    def spawn_queued(self):
+        """Place queued wave npc until the spawn budget of this tick runs out. Headless runs place a fixed
+        count instead, how many fit in the budget depends on the machine and its load, and every placement
+        draws from the random stream a seeded run replays."""
+        deadline = time.perf_counter() + SPAWN_TIME_BUDGET / 1000
+        limit = HEADLESS_SPAWNS_PER_TICK if self.game.headless else None
+        queue = self.spawn_queue
+        # waves arrive mid play, wherever the player happens to be
+        player_x, player_y = self.game.player.map_pos
+        tiles = [(x, y) for x, y in self.spawn_tiles
+                 if max(abs(x - player_x), abs(y - player_y)) > SPAWN_PLAYER_CLEARANCE]
+        placed = 0
+        while queue:
+            x, y = choice(tiles or self.spawn_tiles)
+            self.spawn(queue.popleft(), (x + 0.5, y + 0.5))
+            placed += 1
+            if placed == limit or (limit is None and time.perf_counter() > deadline):
+                break
+
+    @property
+    def npc_list(self):
+        # living and dying npc, finished corpses are in self.corpses
+        return self.npc_state.npcs
+
+    def spawn(self, npc_type, pos):
+        if assets.is_pending(self.npc_folders[npc_type]):
+            self.waiting_npc.append((npc_type, pos))
+            return
+        pool = self.npc_pool[npc_type]
+        if pool:
+            npc = pool.pop()
+            npc.reset(pos)
+        else:
+            npc = npc_type(self.game, pos=pos)
+        self.add_npc(npc)
+
+    def spawn_waiting(self):
+        waiting, self.waiting_npc = self.waiting_npc, []
+        for npc_type, pos in waiting:
+            self.spawn(npc_type, pos)
+
+    def release_npc(self, npc):
+        if npc.alive:
+            self.npc_index.remove(npc)
+        self.npc_state.remove(npc)
+        self.npc_pool[type(npc)].append(npc)
+
+    def bury_finished(self):
+        """Swap npc whose death animation has finished for a corpse sprite and pool them."""
+        state = self.npc_state
+        finished = np.flatnonzero(~state.alive & (state.frame_counter >= state.last_death_frame))
+        # from the last row down, each removal only moves a row that is not waiting to be removed
+        for row in finished[::-1].tolist():
+            npc = state.npcs[row]
+            if self.corpse_pool:
+                corpse = self.corpse_pool.pop()
+                corpse.reset(npc)
+            else:
+                corpse = Corpse(self.game, npc)
+            self.corpses.append(corpse)
+            self.release_npc(npc)
+        while len(self.corpses) > MAX_CORPSES:
+            self.corpse_pool.append(self.corpses.popleft())
+
+    def reset(self):
+        """Pool every npc and corpse and spawn a fresh population, the decorations stay as they are."""
+        for npc in self.npc_state.npcs[::-1]:
+            self.release_npc(npc)
+        self.corpse_pool.extend(self.corpses)
+        self.corpses.clear()
+        self.waiting_npc.clear()
+        self.spawn_queue.clear()
+        self.wave = 0
+        self.npc_positions = set()
+        self.spawn_npc()
 
     def check_win(self):
-        if not len(self.npc_positions):
+        if self.game.restart_pending:
+            return
+        if not len(self.npc_positions) and not self.waiting_npc and not self.spawn_queue:
+            if self.game.wave_mode:
+                self.next_wave()
+                return
             self.game.object_renderer.win()
-            pg.display.flip()
-            pg.time.delay(1500)
-            self.game.new_game()
+            self.game.show_end_screen()
+            self.game.restart_pending = True
 
     def update(self):
-        self.npc_positions = {npc.map_pos for npc in self.npc_list if npc.alive}
-        [sprite.update() for sprite in self.sprite_list]
-        [npc.update() for npc in self.npc_list]
+        if self.waiting_npc:
+            self.spawn_waiting()
+        if self.spawn_queue:
+            self.spawn_queued()
+        state = self.npc_state
+        state.store_positions()
+        alive = state.alive
+        self.npc_positions = set(zip(state.x[alive].astype(int).tolist(), state.y[alive].astype(int).tolist()))
+        self.game.pathfinding.set_occupied(self.npc_positions)
+        [sprite.tick() for sprite in self.sprite_list]
+        self.ai_scheduler.update(self.npc_state)
+        for row in self.npc_state.move(self.game.map).tolist():
+            self.npc_index.move(self.npc_state.npcs[row])
+        self.bury_finished()
         self.check_win()
 
+    def project_sprites(self, alpha=1.0):
+        """Queue every sprite and npc in view for drawing, seen from the interpolated player view."""
+        player = self.game.player
+        [sprite.get_sprite() for sprite in self.sprite_list]
+        [corpse.get_sprite() for corpse in self.corpses]
+        npcs = self.npc_state.npcs
+        for row in self.npc_state.project(player.view_x, player.view_y, player.view_angle, alpha).tolist():
+            npcs[row].get_sprite_projection()
+
+    def update_line_of_sight(self, rows):
+        # one vectorized cast from the player towards every thinking npc instead of one dda each
+        if not len(rows):
+            return
+        state = self.npc_state
+        state.ray_cast_value[rows] = self.game.raycasting.line_of_sight(state.x[rows], state.y[rows])
+
     def add_npc(self, npc):
-        self.npc_list.append(npc)
+        self.npc_state.add(npc)
+        self.npc_index.insert(npc)
 
     def add_sprite(self, sprite):
-        self.sprite_list.append(sprite)
\ No newline at end of file
+        self.sprite_list.append(sprite)
@@ -1,5 +1,8 @@
 import pygame as pg
+import numpy as np
 from settings import *
+from cache import ColumnCache, TextCache, fonts
+from assets import assets
 
 
 class UIButton:
@@ -9,13 +12,16 @@ class UIButton:
         self.color = color
         self.text_color = text_color
         self.hovered = False
-        self.font = pg.font.SysFont('consolas', 16)
+        self.font = fonts.get('consolas', 16)
+        self.text_surf = None
 
     def draw(self, surface):
         color = (150, 150, 150) if self.hovered else self.color
         pg.draw.rect(surface, color, self.rect)
         pg.draw.rect(surface, (200, 200, 200), self.rect, 2)
-        text_surf = self.font.render(self.text, True, self.text_color)
+        if self.text_surf is None:
+            self.text_surf = self.font.render(self.text, True, self.text_color)
+        text_surf = self.text_surf
         text_rect = text_surf.get_rect(center=self.rect.center)
         surface.blit(text_surf, text_rect)
 
@@ -26,11 +32,68 @@ class UIButton:
         self.hovered = self.rect.collidepoint(mouse_pos)
 
 
+class WallRenderer:
+    """Texture maps every wall column into one pixel array and blits it in a single call."""
+    def __init__(self, textures):
+        self.layer = pg.Surface((NUM_RAYS, HEIGHT), depth=32)
+        self.layer.set_colorkey(WALL_COLOR_KEY)
+        self.scaled_layer = pg.Surface(RES, depth=32) if SCALE > 1 else None
+        if self.scaled_layer:
+            self.scaled_layer.set_colorkey(WALL_COLOR_KEY)
+        # texels mapped to the layer's pixel format, every texture column gets an empty texel
+        # above and below it, the flat index is (texture * size + x) * (size + 2) + y + 1
+        empty = self.layer.map_rgb(WALL_COLOR_KEY)
+        texels = np.full((max(textures) + 1, TEXTURE_SIZE, TEXTURE_SIZE + 2), empty, dtype=np.uint32)
+        for texture, image in textures.items():
+            pixels = pg.surfarray.array3d(image)
+            # texels that happen to use the color key would turn into holes
+            pixels[(pixels == WALL_COLOR_KEY).all(axis=-1)] = WALL_COLOR_KEY[0] - 1, *WALL_COLOR_KEY[1:]
+            texels[texture, :, 1:-1] = pg.surfarray.map_array(self.layer, pixels)
+        self.texels = texels.reshape(-1)
+        self.rows = np.arange(HEIGHT, dtype=np.float32)
+        # frame sized work arrays are reused, fresh ones every frame can cost a page fault per page
+        self.texel_y = np.empty((HEIGHT, NUM_RAYS), np.float32)
+        self.texel = np.empty((HEIGHT, NUM_RAYS), np.int32)
+        self.texel_colors = np.empty((HEIGHT, NUM_RAYS), np.uint32)
+
+    def draw(self, screen, proj_height, texture, offset):
+        # only the rows that some wall reaches into need texturing
+        half_band = min(HALF_HEIGHT, int(proj_height.max()) // 2 + 1)
+        top, band = HALF_HEIGHT - half_band, 2 * half_band
+
+        # texel row for every (screen row, ray), rows past either end of a wall land on the empty texels
+        step = (TEXTURE_SIZE / (proj_height + 1e-6)).astype(np.float32)
+        texel_y = np.multiply(self.rows[top:top + band, None], step, out=self.texel_y[:band])
+        texel_y += (proj_height / 2 - HALF_HEIGHT).astype(np.float32) * step + 1
+        np.clip(texel_y, 0, TEXTURE_SIZE + 1, out=texel_y)
+
+        texel_x = np.minimum((offset * TEXTURE_SIZE).astype(np.int32), TEXTURE_SIZE - 1)
+        column = (texture.astype(np.int32) * TEXTURE_SIZE + texel_x) * (TEXTURE_SIZE + 2)
+        texel = self.texel[:band]
+        np.copyto(texel, texel_y, casting='unsafe')
+        texel += column
+
+        self.layer.fill(WALL_COLOR_KEY)
+        pixels = pg.surfarray.pixels2d(self.layer)
+        pixels[:, top:top + band] = self.texels.take(texel, out=self.texel_colors[:band]).T
+        del pixels
+
+        if self.scaled_layer:
+            area = pg.Rect(0, top, WIDTH, band)
+            pg.transform.scale(self.layer.subsurface(0, top, NUM_RAYS, band), area.size,
+                               self.scaled_layer.subsurface(area))
+            screen.blit(self.scaled_layer, area, area)
+        else:
+            screen.blit(self.layer, (0, top), (0, top, NUM_RAYS, band))
+
+
 class ObjectRenderer:
     def __init__(self, game):
         self.game = game
         self.screen = game.screen
         self.wall_textures = self.load_wall_textures()
+        self.column_cache = ColumnCache(self.wall_textures)
+        self.wall_renderer = WallRenderer(self.wall_textures)
         self.sky_image = self.get_texture('resources/textures/sky.png', (WIDTH, HALF_HEIGHT))
         self.sky_offset = 0
         self.blood_screen = self.get_texture('resources/textures/blood_screen.png', RES)
@@ -40,7 +103,8 @@ class ObjectRenderer:
         self.digits = dict(zip(map(str, range(11)), self.digit_images))
         self.game_over_image = self.get_texture('resources/textures/game_over.png', RES)
         self.win_image = self.get_texture('resources/textures/win.png', RES)
-        self.ui_font = pg.font.SysFont('consolas', 26)
+        self.ui_font = fonts.get('consolas', 26)
+        self.text = TextCache()
         self.shake_intensity = 0  # Screen shake effect
         
         # Player sprites for TPS
@@ -56,8 +120,14 @@ class ObjectRenderer:
         # FPS/TPS Toggle Button
         self.tps_button = UIButton(WIDTH - 140, HEIGHT - 50, 130, 40, 'FPS/TPS')
 
+    def reset(self):
+        self.sky_offset = 0
+        self.shake_intensity = 0
+
     def draw(self):
         self.draw_background()
+        if WALL_RENDERER == 'framebuffer':
+            self.draw_walls()
         self.render_game_objects()
         self.draw_player_health()
         self.draw_crosshair()
@@ -78,13 +148,17 @@ class ObjectRenderer:
         self.screen.blit(self.digits['10'], ((i + 1) * self.digit_size, 0))
         
         # Ammo display
-        ammo_font = pg.font.SysFont('consolas', 36, bold=True)
-        ammo_text = ammo_font.render(f'AMMO: {self.game.player.ammo}', True, (255, 200, 50))
+        ammo_font = fonts.get('consolas', 36, bold=True)
+        ammo_text = self.text.render('ammo', ammo_font, f'AMMO: {self.game.player.ammo}', (255, 200, 50))
         self.screen.blit(ammo_text, (WIDTH - 220, 10))
         
         # Kills counter
-        kills_text = ammo_font.render(f'KILLS: {self.game.player.kills}', True, (255, 100, 100))
+        kills_text = self.text.render('kills', ammo_font, f'KILLS: {self.game.player.kills}', (255, 100, 100))
         self.screen.blit(kills_text, (WIDTH - 220, 55))
+
+        if self.game.wave_mode:
+            wave_text = self.text.render('wave', ammo_font, f'WAVE: {self.game.object_handler.wave}', (255, 255, 255))
+            self.screen.blit(wave_text, (WIDTH - 220, 100))
         
         # Stamina bar
         self.draw_stamina_bar()
@@ -103,10 +177,17 @@ class ObjectRenderer:
         # floor
         pg.draw.rect(self.screen, FLOOR_COLOR, (0, HALF_HEIGHT, WIDTH, HEIGHT))
 
+    def draw_walls(self):
+        depth, proj_height, texture, offset = self.game.raycasting.ray_casting_arrays
+        self.wall_renderer.draw(self.screen, proj_height, texture, offset)
+
     def render_game_objects(self):
+        if WALL_RENDERER != 'framebuffer':
+            self.screen.blits(self.game.raycasting.walls_to_render, False)
+        # sprites are already clipped against the walls, they only need ordering among themselves
         list_objects = sorted(self.game.raycasting.objects_to_render, key=lambda t: t[0], reverse=True)
-        for depth, image, pos in list_objects:
-            self.screen.blit(image, pos)
+        for depth, image, pos, area in list_objects:
+            self.screen.blit(image, pos, area)
 
     def draw_crosshair(self):
         cx, cy = HALF_WIDTH, HALF_HEIGHT
@@ -127,14 +208,14 @@ class ObjectRenderer:
         progress = weapon.reload_progress
         pg.draw.rect(self.screen, RELOAD_BAR_COLOR, (x, y, int(bar_w * progress), bar_h))
         if self.ui_font:
-            label = self.ui_font.render('RELOADING', True, RELOAD_BAR_COLOR)
+            label = self.text.render('reloading', self.ui_font, 'RELOADING', RELOAD_BAR_COLOR)
             self.screen.blit(label, (x, y - label.get_height() - 6))
     
     def draw_damage_indicators(self):
         """Draw red arrows showing damage direction."""
         for angle, _ in self.game.player.damage_indicators:
             # Calculate arrow position on screen edge
-            relative_angle = angle - self.game.player.angle
+            relative_angle = angle - self.game.player.view_angle
             arrow_dist = 150
             arrow_x = HALF_WIDTH + int(math.cos(relative_angle) * arrow_dist)
             arrow_y = HALF_HEIGHT + int(math.sin(relative_angle) * arrow_dist)
@@ -155,9 +236,10 @@ class ObjectRenderer:
     
     def draw_weapon_ammo(self):
         """Show ammo count for current weapon."""
-        ammo_font = pg.font.SysFont('consolas', 24, bold=True)
+        ammo_font = fonts.get('consolas', 24, bold=True)
         ammo_per_mag = self.game.weapon_manager.current_weapon.ammo_per_mag
-        ammo_text = ammo_font.render(f'{self.game.player.ammo}/{ammo_per_mag}', True, (150, 200, 255))
+        ammo_text = self.text.render('weapon_ammo', ammo_font, f'{self.game.player.ammo}/{ammo_per_mag}',
+                                     (150, 200, 255))
         self.screen.blit(ammo_text, (HALF_WIDTH - ammo_text.get_width() // 2, HEIGHT - 90))
     
     def draw_stamina_bar(self):
@@ -185,8 +267,7 @@ class ObjectRenderer:
         pg.draw.rect(self.screen, (200, 200, 200), (x, y, bar_width, bar_height), 2)
         
         # Label
-        label_font = pg.font.SysFont('consolas', 14)
-        label = label_font.render('STAMINA', True, (200, 200, 200))
+        label = self.text.render('stamina', fonts.get('consolas', 14), 'STAMINA', (200, 200, 200))
         self.screen.blit(label, (x, y - 20))
 
     def draw_tps_avatar(self):
@@ -199,12 +280,12 @@ class ObjectRenderer:
             return
         
         # Select sprite based on state
+        keys = self.game.input.get_pressed()
         if weapon.reloading:
             sprite_key = 'shoot'
         elif player.is_sprinting:
             sprite_key = 'run'
-        elif pg.key.get_pressed()[pg.K_w] or pg.key.get_pressed()[pg.K_UP] or \
-             pg.key.get_pressed()[pg.K_s] or pg.key.get_pressed()[pg.K_DOWN]:
+        elif keys[pg.K_w] or keys[pg.K_UP] or keys[pg.K_s] or keys[pg.K_DOWN]:
             sprite_key = 'walk'
         else:
             sprite_key = 'idle'
@@ -226,9 +307,8 @@ class ObjectRenderer:
         self.screen.blit(scaled_sprite, (avatar_x, avatar_y))
         
         # Simple health display at bottom-left (away from character)
-        hp_font = pg.font.SysFont('consolas', 18)
-        hp_text = hp_font.render(f'HP: {player.health}  Stamina: {int(player.stamina)}', 
-                                 True, (255, 100, 100))
+        hp_text = self.text.render('tps_hp', fonts.get('consolas', 18),
+                                   f'HP: {player.health}  Stamina: {int(player.stamina)}', (255, 100, 100))
         self.screen.blit(hp_text, (10, HEIGHT - 35))
 
     def draw_ui_buttons(self):
@@ -240,21 +320,19 @@ class ObjectRenderer:
     def draw_mode_indicator(self):
         """Show current mode in corner."""
         if self.game.player.is_tps:
-            mode_font = pg.font.SysFont('consolas', 18)
-            mode_surf = mode_font.render('MODE: TPS', True, (100, 200, 255))
+            mode_surf = self.text.render('mode', fonts.get('consolas', 18), 'MODE: TPS', (100, 200, 255))
             self.screen.blit(mode_surf, (10, 10))
 
     def draw_v_key_hint(self):
         """Show V key hint for toggling FPS/TPS."""
         if not self.game.player.is_tps:
-            hint_font = pg.font.SysFont('consolas', 16)
-            hint_text = hint_font.render('Press V to toggle FPS/TPS', True, (150, 150, 150))
+            hint_text = self.text.render('v_key_hint', fonts.get('consolas', 16), 'Press V to toggle FPS/TPS',
+                                         (150, 150, 150))
             self.screen.blit(hint_text, (10, HEIGHT - 35))
 
     @staticmethod
     def get_texture(path, res=(TEXTURE_SIZE, TEXTURE_SIZE)):
-        texture = pg.image.load(path).convert_alpha()
-        return pg.transform.scale(texture, res)
+        return assets.load_texture(path, res)
 
     def load_wall_textures(self):
         return {
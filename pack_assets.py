@@ -0,0 +1,92 @@
+"""
+Offline asset packer: bakes everything under resources/ into one indexed file the game memory maps at start.
+
+    python pack_assets.py
+
+Images are stored as raw RGBA pixels so loading skips png decoding, textures the renderer scales at load are
+also stored pre-scaled for the current settings. Sounds are stored as they are. Rebuild after changing
+resources/ or the resolution. Until then the game skips entries whose source file changed and folders whose
+files changed, and loads those from resources/ instead, a stale pre-scaled size simply falls back to scaling
+at load.
+"""
+import argparse
+import json
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame as pg
+from settings import *
+from assets import PACK_ALIGN, PACK_HEADER, PACK_MAGIC, PACK_VERSION, scaled_key
+from loading import SCALED_TEXTURES
+
+RESOURCES = 'resources'
+IMAGE_EXTENSIONS = '.png', '.jpg', '.jpeg', '.bmp'
+
+
+def source_stamp(path):
+    """Size and modification time of the file an entry was built from, the game skips the entry once they
+    no longer match."""
+    stat = os.stat(path)
+    return {'source': [stat.st_size, stat.st_mtime_ns]}
+
+
+def image_entry(path, surface):
+    return pg.image.tobytes(surface, 'RGBA'), {'size': list(surface.get_size()), **source_stamp(path)}
+
+
+def collect(root):
+    """Pack entries as (key, bytes, metadata) and the file listing of every folder."""
+    entries, folders = [], {}
+    scaled_only = {path for path, size in SCALED_TEXTURES}  # never loaded at their native size
+    for folder, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        folder = folder.replace(os.sep, '/')
+        # listdir order, the order load_folder would have read the frames in
+        folders[folder] = [name for name in os.listdir(folder) if os.path.isfile(os.path.join(folder, name))]
+        for name in folders[folder]:
+            path = folder + '/' + name
+            if path in scaled_only:
+                continue
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                entries.append((path, *image_entry(path, pg.image.load(path).convert_alpha())))
+            else:
+                with open(path, 'rb') as f:
+                    entries.append((path, f.read(), source_stamp(path)))
+    for path, size in SCALED_TEXTURES:
+        if os.path.isfile(path):
+            image = pg.transform.scale(pg.image.load(path).convert_alpha(), size)
+            entries.append((scaled_key(path, size), *image_entry(path, image)))
+    return entries, folders
+
+
+def write_pack(path, entries, folders):
+    index, offset = {}, 0
+    for key, data, meta in entries:
+        index[key] = {'offset': offset, 'length': len(data), **meta}
+        offset += -(-len(data) // PACK_ALIGN) * PACK_ALIGN
+    index_bytes = json.dumps({'entries': index, 'folders': folders}, separators=(',', ':')).encode()
+    header = PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index_bytes))
+
+    with open(path, 'wb') as f:
+        f.write(header + index_bytes)
+        f.write(bytes(-f.tell() % PACK_ALIGN))
+        for key, data, meta in entries:
+            f.write(data)
+            f.write(bytes(-len(data) % PACK_ALIGN))
+    return offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=ASSET_PACK)
+    args = parser.parse_args()
+
+    pg.init()
+    pg.display.set_mode((1, 1))  # convert_alpha needs a display, its pixel format is what the game uses
+    entries, folders = collect(RESOURCES)
+    data_size = write_pack(args.output, entries, folders)
+    print(f'{len(entries)} entries, {data_size / 1024 / 1024:.1f} MB written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 from collections import deque
-from functools import lru_cache
+from heapq import heappush, heappop
+from settings import *
+from cache import LRUCache
 
 
 class PathFinding:
@@ -8,11 +10,82 @@ class PathFinding:
         self.map = game.map.mini_map
         self.ways = [-1, 0], [0, -1], [1, 0], [0, 1], [-1, -1], [1, -1], [1, 1], [-1, 1]
         self.graph = {}
+        # same tiles with move costs and without diagonals that cut wall corners, used by astar
+        self.weighted_graph = {}
         self.get_graph()
+        self.searches = 0
+        self.nodes_expanded = 0
+        # tiles taken by npc, searches route around them so cached paths expire when they change
+        self.occupied = set()
+        self.occupancy_version = 0
+        self.path_cache = LRUCache(PATH_CACHE_SIZE)
+        # bfs distance of every reachable tile to flow_goal, shared by all npc
+        self.flow_goal = None
+        self.flow_distance = {}
+
+    def get_next_step(self, start, goal):
+        if NPC_PATHFINDING == 'flow_field':
+            return self.get_flow_step(start, goal)
+        return self.get_path(start, goal)
+
+    def get_flow_step(self, start, goal):
+        if goal != self.flow_goal:
+            self.update_flow_field(goal)
+        distance = self.flow_distance
+        if start not in distance or start == goal:
+            return goal
+
+        # step to the neighbour closest to the goal, free tiles first
+        occupied = self.occupied
+        best_step, best_distance = None, distance[start]
+        blocked_step = None
+        for next_node in self.graph[start]:
+            next_distance = distance.get(next_node, best_distance)
+            if next_distance < best_distance:
+                if next_node in occupied:
+                    blocked_step = blocked_step or next_node
+                else:
+                    best_step, best_distance = next_node, next_distance
+        return best_step or blocked_step
+
+    def update_flow_field(self, goal):
+        queue = deque([goal])
+        distance = {goal: 0}
+
+        while queue:
+            cur_node = queue.popleft()
+            next_distance = distance[cur_node] + 1
+            for next_node in self.graph.get(cur_node, ()):
+                if next_node not in distance:
+                    distance[next_node] = next_distance
+                    queue.append(next_node)
+        self.flow_goal = goal
+        self.flow_distance = distance
+
+    def reset(self):
+        """Forget the npc occupancy of the last game, the graph and the flow field only depend on the map."""
+        self.set_occupied(set())
+
+    def set_occupied(self, positions):
+        if positions != self.occupied:
+            self.occupied = positions
+            self.occupancy_version += 1
+            self.path_cache.clear()
 
-    @lru_cache
     def get_path(self, start, goal):
-        self.visited = self.bfs(start, goal, self.graph)
+        key = start, goal
+        step = self.path_cache.get(key)
+        if step is None:
+            step = self.find_path(start, goal)
+            self.path_cache.put(key, step)
+        return step
+
+    def find_path(self, start, goal):
+        self.searches += 1
+        if PATH_ALGORITHM == 'astar':
+            self.visited = self.astar(start, goal)
+        else:
+            self.visited = self.bfs(start, goal, self.graph)
         path = [goal]
         step = self.visited.get(goal, start)
 
@@ -29,19 +102,71 @@ class PathFinding:
             cur_node = queue.popleft()
             if cur_node == goal:
                 break
+            self.nodes_expanded += 1
             next_nodes = graph[cur_node]
 
             for next_node in next_nodes:
-                if next_node not in visited and next_node not in self.game.object_handler.npc_positions:
+                if next_node not in visited and next_node not in self.occupied:
                     queue.append(next_node)
                     visited[next_node] = cur_node
         return visited
 
+    def astar(self, start, goal):
+        # queue entries are (estimate, -cost, node), ties go to the node furthest along
+        queue = [(0, 0, start)]
+        visited = {start: None}
+        cost = {start: 0}
+        graph, occupied, inf = self.weighted_graph, self.occupied, math.inf
+        goal_x, goal_y = goal
+        diagonal = math.sqrt(2) - 2
+        expanded = 0
+
+        while queue:
+            _, cur_cost, cur_node = heappop(queue)
+            cur_cost = -cur_cost
+            if cur_node == goal:
+                break
+            if cur_cost > cost[cur_node]:
+                continue  # stale queue entry, the node was reached cheaper since
+            expanded += 1
+
+            for next_node, move_cost in graph[cur_node]:
+                next_cost = cur_cost + move_cost
+                if next_cost < cost.get(next_node, inf) and next_node not in occupied:
+                    cost[next_node] = next_cost
+                    visited[next_node] = cur_node
+                    # octile distance, exact on an open 8-connected grid
+                    dx, dy = abs(next_node[0] - goal_x), abs(next_node[1] - goal_y)
+                    estimate = next_cost + dx + dy + diagonal * (dx if dx < dy else dy)
+                    heappush(queue, (estimate, -next_cost, next_node))
+        self.nodes_expanded += expanded
+        return visited
+
+    def stats(self):
+        return {'occupancy_version': self.occupancy_version, 'searches': self.searches,
+                'nodes_expanded': self.nodes_expanded, 'path_cache': self.path_cache.stats()}
+
     def get_next_nodes(self, x, y):
-        return [(x + dx, y + dy) for dx, dy in self.ways if (x + dx, y + dy) not in self.game.map.world_map]
+        return [(x + dx, y + dy) for dx, dy in self.ways if not self.game.map.is_wall(x + dx, y + dy)]
+
+    def get_weighted_nodes(self, x, y):
+        is_wall = self.game.map.is_wall
+        nodes = []
+        for dx, dy in self.ways:
+            if is_wall(x + dx, y + dy):
+                continue
+            if dx and dy:
+                # no squeezing diagonally past a wall corner
+                if is_wall(x + dx, y) or is_wall(x, y + dy):
+                    continue
+                nodes.append(((x + dx, y + dy), math.sqrt(2)))
+            else:
+                nodes.append(((x + dx, y + dy), 1))
+        return nodes
 
     def get_graph(self):
         for y, row in enumerate(self.map):
             for x, col in enumerate(row):
                 if not col:
-                    self.graph[(x, y)] = self.graph.get((x, y), []) + self.get_next_nodes(x, y)
\ No newline at end of file
+                    self.graph[(x, y)] = self.graph.get((x, y), []) + self.get_next_nodes(x, y)
+                    self.weighted_graph[(x, y)] = self.get_weighted_nodes(x, y)
\ No newline at end of file
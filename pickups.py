@@ -3,19 +3,18 @@ Pickups system for health and ammo.
 """
 import pygame as pg
 from settings import *
+from cache import sprite_cache
 import math
 
 
 class Pickup:
+    images = {}  # one base image per color, scaled through the sprite cache
+
     def __init__(self, game, pos, pickup_type):
         self.game = game
-        self.x, self.y = pos
         self.type = pickup_type  # 'health' or 'ammo'
-        self.collected = False
         self.size = 0.3
         self.animation_time = 200
-        self.animation_time_prev = pg.time.get_ticks()
-        self.angle = 0
         
         if self.type == 'health':
             self.value = 25
@@ -23,28 +22,28 @@ class Pickup:
         else:  # ammo
             self.value = 20
             self.color = (255, 200, 50)
+        self.reset(pos)
+
+    def reset(self, pos):
+        """Back to an uncollected pickup at pos, for pickups placed again from the PickupHandler's pools."""
+        self.x, self.y = pos
+        self.collected = False
+        self.animation_time_prev = self.game.sim_time
+        self.angle = 0
     
-    def check_pickup(self):
-        if self.collected:
-            return
-        
+    def collect(self):
         player = self.game.player
-        dx = self.x - player.x
-        dy = self.y - player.y
-        distance = math.sqrt(dx * dx + dy * dy)
-        
-        if distance < 0.6:  # Pickup range
-            self.collected = True
-            if self.type == 'health':
-                player.health = min(PLAYER_MAX_HEALTH, player.health + self.value)
-                self.game.sound.npc_pain.play()  # Reuse sound
-            else:  # ammo
-                player.ammo = min(player.max_ammo, player.ammo + self.value)
-                self.game.sound.shotgun.play()  # Reuse sound
+        self.collected = True
+        self.game.object_handler.pickup_index.remove(self)
+        if self.type == 'health':
+            player.health = min(PLAYER_MAX_HEALTH, player.health + self.value)
+            self.game.sound.npc_pain.play()  # Reuse sound
+        else:  # ammo
+            player.ammo = min(player.max_ammo, player.ammo + self.value)
+            self.game.sound.shotgun.play()  # Reuse sound
     
     def update(self):
-        self.check_pickup()
-        time_now = pg.time.get_ticks()
+        time_now = self.game.sim_time
         if time_now - self.animation_time_prev > self.animation_time:
             self.animation_time_prev = time_now
             self.angle += 0.2
@@ -53,13 +52,14 @@ class Pickup:
         if self.collected:
             return None
         
-        dx = self.x - self.game.player.x
-        dy = self.y - self.game.player.y
+        player = self.game.player
+        dx = self.x - player.view_x
+        dy = self.y - player.view_y
         
         theta = math.atan2(dy, dx)
-        delta = theta - self.game.player.angle
+        delta = theta - player.view_angle
         
-        if (dx > 0 and self.game.player.angle > math.pi) or (dx < 0 and dy < 0):
+        if (dx > 0 and player.view_angle > math.pi) or (dx < 0 and dy < 0):
             delta += math.tau
         
         delta_rays = delta / DELTA_ANGLE
@@ -68,37 +68,80 @@ class Pickup:
         dist = math.sqrt(dx * dx + dy * dy)
         if -5 <= delta_rays <= NUM_RAYS + 5 and dist > 0.5:
             proj_height = min(int(SCREEN_DIST / dist * self.size * 200), 2 * HEIGHT)
-            half_proj_height = proj_height // 2
-            
-            # Create simple colored square as pickup sprite
-            surface = pg.Surface((proj_height, proj_height), pg.SRCALPHA)
-            pg.draw.circle(surface, self.color, (half_proj_height, half_proj_height), half_proj_height)
-            pg.draw.circle(surface, (255, 255, 255), (half_proj_height, half_proj_height), half_proj_height // 2)
-            
-            return (dist, surface, (screen_x - half_proj_height, HALF_HEIGHT - half_proj_height))
+            surface = sprite_cache.get_scaled(self.get_image(), proj_height, proj_height)
+            pos_x = int(screen_x) - surface.get_width() // 2
+            pos_y = HALF_HEIGHT - surface.get_height() // 2
+
+            return [(dist, surface, (pos_x + area.x, pos_y), area) for area in
+                    self.game.raycasting.get_visible_areas(pos_x, surface.get_width(), surface.get_height(), dist)]
         return None
 
+    def get_image(self):
+        image = Pickup.images.get(self.color)
+        if image is None:
+            # simple colored circle as pickup sprite
+            size = PICKUP_IMAGE_SIZE
+            image = pg.Surface((size, size), pg.SRCALPHA)
+            pg.draw.circle(image, self.color, (size // 2, size // 2), size // 2)
+            pg.draw.circle(image, (255, 255, 255), (size // 2, size // 2), size // 4)
+            Pickup.images[self.color] = image
+        return image
+
 
 class PickupHandler:
     def __init__(self, game):
         self.game = game
         self.pickups = []
+        self.pool = {'health': [], 'ammo': []}  # collected pickups waiting to be placed again
+        self.index = game.object_handler.pickup_index
         self.spawn_pickups()
     
     def spawn_pickups(self):
         # Health packs
         health_positions = [(3.5, 3.5), (8.5, 8.5), (12.5, 3.5), (3.5, 15.5), (14.5, 20.5)]
         for pos in health_positions:
-            self.pickups.append(Pickup(self.game, pos, 'health'))
+            self.spawn(pos, 'health')
         
         # Ammo crates
         ammo_positions = [(5.5, 5.5), (10.5, 10.5), (7.5, 15.5), (12.5, 18.5)]
         for pos in ammo_positions:
-            self.pickups.append(Pickup(self.game, pos, 'ammo'))
+            self.spawn(pos, 'ammo')
+
+    def spawn(self, pos, pickup_type):
+        pool = self.pool[pickup_type]
+        if pool:
+            pickup = pool.pop()
+            pickup.reset(pos)
+        else:
+            pickup = Pickup(self.game, pos, pickup_type)
+        self.add_pickup(pickup)
+
+    def add_pickup(self, pickup):
+        self.pickups.append(pickup)
+        self.index.insert(pickup)
+
+    def release(self, pickup):
+        if not pickup.collected:
+            self.index.remove(pickup)
+        self.pickups.remove(pickup)
+        self.pool[pickup.type].append(pickup)
+
+    def reset(self):
+        for pickup in self.pickups[::-1]:
+            self.release(pickup)
+        self.spawn_pickups()
     
     def update(self):
+        player = self.game.player
+        # only pickups near the player are range checked, collected ones leave the index
+        for pickup in self.index.query_radius(player.x, player.y, PICKUP_RANGE):
+            pickup.collect()
+            self.release(pickup)
         for pickup in self.pickups:
             pickup.update()
+
+    def get_pickups_at(self, x, y):
+        return self.index.query_tile(x, y)
     
     def get_sprites_to_render(self):
         sprites = []
@@ -106,5 +149,5 @@ class PickupHandler:
             if not pickup.collected:
                 sprite_proj = pickup.get_sprite_projection()
                 if sprite_proj:
-                    sprites.append(sprite_proj)
+                    sprites.extend(sprite_proj)
         return sprites
@@ -8,11 +8,14 @@ class Player:
         self.game = game
         self.x, self.y = PLAYER_POS
         self.angle = PLAYER_ANGLE
+        # pose at the previous tick, the rendered view is interpolated between it and the current one
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
+        self.view_x, self.view_y, self.view_angle = self.x, self.y, self.angle
         self.shot = False
         self.health = PLAYER_MAX_HEALTH
         self.rel = 0
         self.health_recovery_delay = 700
-        self.time_prev = pg.time.get_ticks()
+        self.time_prev = game.sim_time
         # diagonal movement correction
         self.diag_move_corr = 1 / math.sqrt(2)
         self.stamina = STAMINA_MAX
@@ -30,30 +33,28 @@ class Player:
             self.health += 1
 
     def check_health_recovery_delay(self):
-        time_now = pg.time.get_ticks()
+        time_now = self.game.sim_time
         if time_now - self.time_prev > self.health_recovery_delay:
             self.time_prev = time_now
             return True
 
     def check_game_over(self):
-        if self.health < 1:
+        if self.health < 1 and not self.game.restart_pending:
             self.game.object_renderer.game_over()
-            pg.display.flip()
-            pg.time.delay(1500)
-            self.game.new_game()
+            self.game.show_end_screen()
+            self.game.restart_pending = True
 
     def get_damage(self, damage):
         self.health -= damage
         self.game.object_renderer.player_damage()
         self.game.sound.player_pain.play()
         # Add damage indicator from attacking NPC
-        for npc in self.game.object_handler.npc_list:
-            if npc.alive and npc.attack_dist > 0:
-                dx = npc.x - self.x
-                dy = npc.y - self.y
-                angle = math.atan2(dy, dx)
-                self.damage_indicators.append((angle, pg.time.get_ticks()))
-                break
+        npc = self.game.object_handler.npc_index.nearest(self.x, self.y, NPC_ATTACK_RADIUS)
+        if npc is not None:
+            dx = npc.x - self.x
+            dy = npc.y - self.y
+            angle = math.atan2(dy, dx)
+            self.damage_indicators.append((angle, self.game.sim_time))
         self.check_game_over()
 
     def single_fire_event(self, event):
@@ -80,7 +81,7 @@ class Player:
         speed_sin = speed * sin_a
         speed_cos = speed * cos_a
 
-        keys = pg.key.get_pressed()
+        keys = self.game.input.get_pressed()
         crouch = keys[pg.K_LCTRL] or keys[pg.K_RCTRL]
         sprint_input = (keys[pg.K_LSHIFT] or keys[pg.K_RSHIFT]) and not crouch and self.stamina > 1
         num_key_pressed = -1
@@ -134,7 +135,7 @@ class Player:
         self.angle %= math.tau
 
     def check_wall(self, x, y):
-        return (x, y) not in self.game.map.world_map
+        return not self.game.map.is_wall(x, y)
 
     def check_wall_collision(self, dx, dy, collider_scale=1.0):
         scale = (PLAYER_SIZE_SCALE * collider_scale) / self.game.delta_time
@@ -150,10 +151,7 @@ class Player:
         pg.draw.circle(self.game.screen, 'green', (self.x * 100, self.y * 100), 15)
 
     def mouse_control(self):
-        mx, my = pg.mouse.get_pos()
-        if mx < MOUSE_BORDER_LEFT or mx > MOUSE_BORDER_RIGHT:
-            pg.mouse.set_pos([HALF_WIDTH, HALF_HEIGHT])
-        self.rel = pg.mouse.get_rel()[0]
+        self.rel = self.game.input.get_mouse_rel()
         self.rel = max(-MOUSE_MAX_REL, min(MOUSE_MAX_REL, self.rel))
         self.angle += self.rel * MOUSE_SENSITIVITY * self.game.delta_time
 
@@ -169,29 +167,32 @@ class Player:
         self.melee_cooldown = 500  # 500ms cooldown
         self.game.sound.shotgun.play()  # Reuse sound
         
-        # Check for nearby enemies
-        for npc in self.game.object_handler.npc_list:
-            if npc.alive:
-                dx = npc.x - self.x
-                dy = npc.y - self.y
-                dist = math.sqrt(dx * dx + dy * dy)
-                if dist < 1.5:  # Melee range
-                    npc.health -= self.melee_damage
-                    npc.pain = True
-                    self.game.sound.npc_pain.play()
-                    npc.check_health()
+        # Check for nearby enemies, the index only holds alive npc
+        for npc in self.game.object_handler.npc_index.query_radius(self.x, self.y, MELEE_RANGE):
+            npc.health -= self.melee_damage
+            npc.pain = True
+            self.game.sound.npc_pain.play()
+            npc.check_health()
 
     def update(self):
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
         self.movement()
         self.mouse_control()
         self.recover_health()
         if self.melee_cooldown > 0:
             self.melee_cooldown -= self.game.delta_time
         # Update damage indicators
-        current_time = pg.time.get_ticks()
+        current_time = self.game.sim_time
         self.damage_indicators = [(angle, time) for angle, time in self.damage_indicators 
                                   if current_time - time < 1000]
 
+    def update_view(self, alpha):
+        """Pose to render at, alpha is how far the frame is between the last tick and the next one."""
+        self.view_x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.view_y = self.prev_y + (self.y - self.prev_y) * alpha
+        turn = (self.angle - self.prev_angle + math.pi) % math.tau - math.pi
+        self.view_angle = (self.prev_angle + turn * alpha) % math.tau
+
     @property
     def pos(self):
         return self.x, self.y
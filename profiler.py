@@ -0,0 +1,85 @@
+"""
+Per-stage timing of the frame pipeline, shared by the benchmark runner and the in-game overlay.
+"""
+import time
+
+MISSING = object()
+
+
+class StageProfiler:
+    """Times or counts calls of chosen methods by shadowing them on their objects, nothing is measured
+    until then and uninstrument puts the originals back."""
+    def __init__(self):
+        self.stages = {}  # stage name -> ms spent in it since the last end_frame
+        self.counters = {}  # counter name -> calls since the last end_frame
+        self.instrumented = []
+
+    def instrument(self, obj, method_name, stage=None):
+        method = getattr(obj, method_name)
+        stage = stage or f'{type(obj).__name__}.{method_name}'
+        stages = self.stages
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stages[stage] = stages.get(stage, 0.0) + (perf_counter() - start) * 1000
+
+        self.shadow(obj, method_name, timed)
+
+    def count(self, obj, function_name, counter, when=None):
+        """Count calls, or with when only the calls it returns true for given the same arguments."""
+        function = getattr(obj, function_name)
+        counters = self.counters
+
+        def counted(*args, **kwargs):
+            if when is None or when(*args, **kwargs):
+                counters[counter] = counters.get(counter, 0) + 1
+            return function(*args, **kwargs)
+
+        self.shadow(obj, function_name, counted)
+
+    def count_instances(self, obj, class_name, counter):
+        """Count instances built through a class. It is shadowed by a subclass rather than a function, so it
+        still works as a base class and with isinstance, for instances made elsewhere too."""
+        cls = getattr(obj, class_name)
+        counters = self.counters
+
+        class CountedMeta(type(cls)):
+            def __instancecheck__(self, instance):
+                return isinstance(instance, cls)
+
+            def __subclasscheck__(self, subclass):
+                return issubclass(subclass, cls)
+
+        class Counted(cls, metaclass=CountedMeta):
+            def __init__(self, *args, **kwargs):
+                counters[counter] = counters.get(counter, 0) + 1
+                super().__init__(*args, **kwargs)
+
+        Counted.__name__, Counted.__qualname__ = cls.__name__, cls.__qualname__
+        self.shadow(obj, class_name, Counted)
+
+    def shadow(self, obj, name, replacement):
+        # an instance attribute wins over the class method, modules get their own attribute swapped
+        self.instrumented.append((obj, name, vars(obj).get(name, MISSING)))
+        setattr(obj, name, replacement)
+
+    def uninstrument(self):
+        for obj, name, original in reversed(self.instrumented):
+            if original is MISSING:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, original)
+        self.instrumented.clear()
+        self.stages.clear()
+        self.counters.clear()
+
+    def end_frame(self):
+        """Stage times and counters of the frame that just ended, the next frame starts from zero."""
+        stages, counters = dict(self.stages), dict(self.counters)
+        self.stages.clear()
+        self.counters.clear()
+        return stages, counters
@@ -0,0 +1,127 @@
+"""
+In-game profiling overlay, toggled with F3. While off nothing is instrumented.
+"""
+import time
+from collections import deque
+import pygame as pg
+from settings import *
+from profiler import StageProfiler
+from cache import TextCache, fonts
+
+# everything Game.update and Game.draw call, as (game attribute, method)
+STAGES = [
+    ('player', 'update'),
+    ('object_handler', 'update'),
+    ('weapon_manager', 'update'),
+    ('raycasting', 'update'),
+    ('object_handler', 'project_sprites'),
+    ('object_renderer', 'draw'),
+    ('weapon_manager', 'draw'),
+    ('minimap', 'draw'),
+]
+
+
+def allocates(surface, size, dest_surface=None):
+    # scaling into a given destination surface allocates nothing
+    return dest_surface is None
+
+
+# functions that hand back a new surface, with a check for the calls that do where not all of them do
+SURFACE_FACTORIES = [
+    (pg.transform, 'scale', allocates),
+    (pg.transform, 'smoothscale', allocates),
+    (pg.transform, 'rotate', None),
+    (pg.transform, 'rotozoom', None),
+    (pg.transform, 'flip', None),
+]
+
+
+class ProfilerOverlay:
+    def __init__(self, game):
+        self.game = game
+        self.enabled = False
+        self.profiler = StageProfiler()
+        self.frame_times = deque(maxlen=OVERLAY_HISTORY)
+        self.stage_times = {}
+        self.counts = {}
+        self.frame_start = time.perf_counter()
+        self.font = None
+        self.panel = None
+        self.text = TextCache()
+        self.graph_size = 240, 60
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            if self.font is None:
+                self.font = fonts.get('consolas', 14)
+                self.panel = pg.Surface((300, 330), pg.SRCALPHA)
+            self.instrument()
+        else:
+            self.profiler.uninstrument()
+        self.frame_times.clear()
+        self.stage_times.clear()
+        self.frame_start = time.perf_counter()
+
+    def instrument(self):
+        game, profiler = self.game, self.profiler
+        for attr, method_name in STAGES:
+            profiler.instrument(getattr(game, attr), method_name)
+        profiler.count(game.pathfinding, 'get_next_step', 'path queries')
+        profiler.count_instances(pg, 'Surface', 'surfaces')
+        for module, name, when in SURFACE_FACTORIES:
+            profiler.count(module, name, 'surfaces', when)
+
+    def refresh(self):
+        """Re-attach to the subsystems after Game.new_game replaced them."""
+        if self.enabled:
+            self.profiler.uninstrument()
+            self.instrument()
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        time_now = time.perf_counter()
+        self.frame_times.append((time_now - self.frame_start) * 1000)
+        self.frame_start = time_now
+        stages, self.counts = self.profiler.end_frame()
+        self.counts['objects_to_render'] = len(self.game.raycasting.objects_to_render)
+        for stage, ms in stages.items():
+            self.stage_times.setdefault(stage, deque(maxlen=OVERLAY_HISTORY)).append(ms)
+
+    def draw(self):
+        if not self.enabled:
+            return
+        panel, font = self.panel, self.font
+        panel.fill(OVERLAY_BG_COLOR)
+        lines = []
+        if self.frame_times:
+            frame_ms = sum(self.frame_times) / len(self.frame_times)
+            lines.append(f'frame {frame_ms:6.2f} ms  max {max(self.frame_times):6.2f}')
+        for stage, times in self.stage_times.items():
+            lines.append(f'{stage:28}{sum(times) / len(times):6.2f}')
+        lines.append('')
+        for counter in ('objects_to_render', 'surfaces', 'path queries'):
+            lines.append(f'{counter:28}{self.counts.get(counter, 0):6d}')
+
+        y = 6
+        for slot, line in enumerate(lines):
+            panel.blit(self.text.render(slot, font, line, OVERLAY_TEXT_COLOR), (8, y))
+            y += 17
+        self.draw_graph(panel, (8, y + 6))
+        self.game.screen.blit(panel, (10, 120))  # below the health readout
+
+    def draw_graph(self, surface, pos):
+        x, y = pos
+        width, height = self.graph_size
+        pg.draw.rect(surface, (60, 60, 60), (x, y, width, height), 1)
+        # guides at 60 and 30 fps
+        for ms, color in ((1000 / 60, (60, 160, 60)), (1000 / 30, (160, 140, 40))):
+            guide_y = y + height - int(height * ms / OVERLAY_GRAPH_MAX_MS)
+            pg.draw.line(surface, color, (x, guide_y), (x + width - 1, guide_y))
+        bar_width = width / OVERLAY_HISTORY
+        for i, ms in enumerate(self.frame_times):
+            bar_height = min(height, int(height * ms / OVERLAY_GRAPH_MAX_MS))
+            color = (80, 200, 80) if ms <= 1000 / 60 else (220, 180, 60) if ms <= 1000 / 30 else (220, 60, 60)
+            pg.draw.line(surface, color, (x + i * bar_width, y + height - 1),
+                         (x + i * bar_width, y + height - bar_height))
@@ -1,4 +1,5 @@
 import pygame as pg
+import numpy as np
 import math
 from settings import *
 
@@ -7,38 +8,193 @@ class RayCasting:
     def __init__(self, game):
         self.game = game
         self.ray_casting_result = []
+        # the same results as (depth, proj_height, texture, offset) arrays, one entry per ray
+        self.ray_casting_arrays = tuple(np.zeros(NUM_RAYS) for i in range(4))
+        # wall depth of every ray, sprites are clipped against it instead of sorted with the walls
+        self.depth_buffer = self.ray_casting_arrays[0]
+        self.walls_to_render = []
         self.objects_to_render = []
         self.textures = self.game.object_renderer.wall_textures
+        self.column_cache = self.game.object_renderer.column_cache
+        self.ray_offsets = np.arange(NUM_RAYS) * DELTA_ANGLE - HALF_FOV + 0.0001
 
     def get_objects_to_render(self):
         self.objects_to_render = []
+        self.walls_to_render = []
+        if WALL_RENDERER == 'framebuffer':
+            # walls are drawn straight into the frame by ObjectRenderer.draw_walls
+            return
+        get_column = self.column_cache.get_column
         for ray, values in enumerate(self.ray_casting_result):
             depth, proj_height, texture, offset = values
 
-            if proj_height < HEIGHT:
-                wall_column = self.textures[texture].subsurface(
-                    offset * (TEXTURE_SIZE - SCALE), 0, SCALE, TEXTURE_SIZE
-                )
-                wall_column = pg.transform.scale(wall_column, (SCALE, proj_height))
-                wall_pos = (ray * SCALE, HALF_HEIGHT - proj_height // 2)
-            else:
-                texture_height = TEXTURE_SIZE * HEIGHT / proj_height
-                wall_column = self.textures[texture].subsurface(
-                    offset * (TEXTURE_SIZE - SCALE), HALF_TEXTURE_SIZE - texture_height // 2,
-                    SCALE, texture_height
-                )
-                wall_column = pg.transform.scale(wall_column, (SCALE, HEIGHT))
-                wall_pos = (ray * SCALE, 0)
+            wall_column, wall_y = get_column(texture, offset, proj_height)
+            self.walls_to_render.append((wall_column, (ray * SCALE, wall_y)))
 
-            self.objects_to_render.append((depth, wall_column, wall_pos))
+    def get_visible_areas(self, x, width, height, depth):
+        """Areas of an image drawn at screen x that are not hidden behind a wall closer than depth."""
+        first_ray = max(0, x // SCALE)
+        last_ray = min(NUM_RAYS, -(-(x + width) // SCALE))
+        if first_ray >= last_ray:
+            return []
+        visible = self.depth_buffer[first_ray:last_ray] > depth
+        if visible.all():
+            return [pg.Rect(0, 0, width, height)]
+        if not visible.any():
+            return []
+        # split the visible rays into runs and turn each run back into image columns
+        edges = np.flatnonzero(np.diff(visible)) + 1
+        starts = np.concatenate(([0], edges))
+        ends = np.concatenate((edges, [visible.size]))
+        areas = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if visible[start]:
+                left = max(0, (first_ray + start) * SCALE - x)
+                right = min(width, (first_ray + end) * SCALE - x)
+                areas.append(pg.Rect(left, 0, right - left, height))
+        return areas
 
     def ray_cast(self):
-        self.ray_casting_result = []
-        texture_vert, texture_hor = 1, 1
+        if RAY_CAST_ENGINE == 'numpy':
+            self.ray_cast_numpy()
+        else:
+            self.ray_cast_python()
+
+    def march(self, x, y, dx, dy, depth, delta_depth, target_x=None, target_y=None):
+        """Step all rays through the grid together, returns the texture each ray hit (0 if none)
+        and, when every ray has a target tile, whether it reached that tile before a wall."""
+        grid = self.game.map.grid_array
+        rows, cols = grid.shape
+        texture = np.zeros(x.size, dtype=np.uint8)
+        reached = np.zeros(x.size, dtype=bool)
+        active = np.arange(x.size)
+        for i in range(MAX_DEPTH):
+            # clip before the cast so far-away rays can't overflow, -1 and cols are still outside
+            tile_x = np.clip(x[active], -1, cols).astype(np.intp)
+            tile_y = np.clip(y[active], -1, rows).astype(np.intp)
+            inside = (tile_x >= 0) & (tile_x < cols) & (tile_y >= 0) & (tile_y < rows)
+            tile = np.zeros(active.size, dtype=np.uint8)
+            tile[inside] = grid[tile_y[inside], tile_x[inside]]
+            hit = tile > 0
+            if target_x is not None:
+                on_target = (tile_x == target_x[active]) & (tile_y == target_y[active])
+                reached[active[on_target]] = True
+                hit &= ~on_target
+                stop = hit | on_target
+            else:
+                stop = hit
+            texture[active[hit]] = tile[hit]
+            active = active[~stop]
+            if not active.size:
+                break
+            x[active] += dx[active]
+            y[active] += dy[active]
+            depth[active] += delta_depth[active]
+        return texture, reached
+
+    @staticmethod
+    def fill_missed(texture):
+        # a ray that hits nothing keeps the texture of the previous ray, same as the scalar loop
+        last_hit = np.where(texture > 0, np.arange(texture.size), -1)
+        np.maximum.accumulate(last_hit, out=last_hit)
+        return np.where(last_hit >= 0, texture[last_hit], 1)
+
+    def march_crossings(self, ox, oy, sin_a, cos_a, target_x=None, target_y=None):
+        """March the horizontal and vertical grid crossings of every ray from (ox, oy) in one pass,
+        returns x, y, depth, texture and reached, each split into (horizontal, vertical)."""
+        x_map, y_map = int(ox), int(oy)
+
+        # horizontals
+        down = sin_a > 0
+        y_hor = np.where(down, y_map + 1, y_map - 1e-6)
+        dy_hor = np.where(down, 1.0, -1.0)
+
+        depth_hor = (y_hor - oy) / sin_a
+        x_hor = ox + depth_hor * cos_a
+
+        delta_depth_hor = dy_hor / sin_a
+        dx_hor = delta_depth_hor * cos_a
+
+        # verticals
+        right = cos_a > 0
+        x_vert = np.where(right, x_map + 1, x_map - 1e-6)
+        dx_vert = np.where(right, 1.0, -1.0)
+
+        depth_vert = (x_vert - ox) / cos_a
+        y_vert = oy + depth_vert * sin_a
+
+        delta_depth_vert = dx_vert / cos_a
+        dy_vert = delta_depth_vert * sin_a
+
+        x, y = np.concatenate((x_hor, x_vert)), np.concatenate((y_hor, y_vert))
+        depth = np.concatenate((depth_hor, depth_vert))
+        if target_x is not None:
+            target_x, target_y = np.concatenate((target_x, target_x)), np.concatenate((target_y, target_y))
+        texture, reached = self.march(x, y, np.concatenate((dx_hor, dx_vert)), np.concatenate((dy_hor, dy_vert)),
+                                      depth, np.concatenate((delta_depth_hor, delta_depth_vert)), target_x, target_y)
+        shape = 2, sin_a.size
+        return x.reshape(shape), y.reshape(shape), depth.reshape(shape), texture.reshape(shape), reached.reshape(shape)
+
+    def ray_cast_numpy(self):
+        # walls are cast from the interpolated view, not the last simulation tick
+        player = self.game.player
+        ray_angle = player.view_angle + self.ray_offsets
+        sin_a = np.sin(ray_angle)
+        cos_a = np.cos(ray_angle)
+
+        (x_hor, x_vert), (y_hor, y_vert), (depth_hor, depth_vert), textures, _ = self.march_crossings(
+            player.view_x, player.view_y, sin_a, cos_a)
+        texture_hor, texture_vert = self.fill_missed(textures[0]), self.fill_missed(textures[1])
+
+        # depth, texture offset
+        vert = depth_vert < depth_hor
+        depth = np.where(vert, depth_vert, depth_hor)
+        texture = np.where(vert, texture_vert, texture_hor)
+        y_vert %= 1
+        x_hor %= 1
+        offset = np.where(vert, np.where(cos_a > 0, y_vert, 1 - y_vert), np.where(sin_a > 0, 1 - x_hor, x_hor))
+
+        # remove fishbowl effect
+        depth *= np.cos(player.view_angle - ray_angle)
+
+        # projection
+        proj_height = SCREEN_DIST / (depth + 0.0001)
+
+        # ray casting result
+        self.ray_casting_arrays = depth, proj_height, texture, offset
+        self.depth_buffer = depth
+        self.ray_casting_result = list(zip(depth.tolist(), proj_height.tolist(), texture.tolist(), offset.tolist()))
+
+    def line_of_sight(self, target_x, target_y):
+        """Whether the player sees each target position: one dda per target towards it, stopped by the first
+        wall or the target's tile, all targets marched at once."""
         ox, oy = self.game.player.pos
         x_map, y_map = self.game.player.map_pos
+        tile_x, tile_y = target_x.astype(np.intp), target_y.astype(np.intp)
 
-        ray_angle = self.game.player.angle - HALF_FOV + 0.0001
+        ray_angle = np.arctan2(target_y - oy, target_x - ox)
+        sin_a = np.sin(ray_angle)
+        cos_a = np.cos(ray_angle)
+        # a ray along an axis never crosses the lines of the other one, keep it from dividing by zero
+        sin_a[sin_a == 0] = 1e-12
+        cos_a[cos_a == 0] = 1e-12
+
+        _, _, depth, wall, reached = self.march_crossings(ox, oy, sin_a, cos_a, tile_x, tile_y)
+        player_dist = np.where(reached, depth, 0).max(axis=0)
+        wall_dist = np.where(wall > 0, depth, 0).max(axis=0)
+
+        same_tile = (tile_x == x_map) & (tile_y == y_map)
+        return same_tile | ((0 < player_dist) & (player_dist < wall_dist)) | (wall_dist == 0)
+
+    def ray_cast_python(self):
+        self.ray_casting_result = []
+        texture_vert, texture_hor = 1, 1
+        tile_at = self.game.map.tile_at
+        player = self.game.player
+        ox, oy = player.view_x, player.view_y
+        x_map, y_map = int(ox), int(oy)
+
+        ray_angle = player.view_angle - HALF_FOV + 0.0001
         for ray in range(NUM_RAYS):
             sin_a = math.sin(ray_angle)
             cos_a = math.cos(ray_angle)
@@ -53,9 +209,9 @@ class RayCasting:
             dx = delta_depth * cos_a
 
             for i in range(MAX_DEPTH):
-                tile_hor = int(x_hor), int(y_hor)
-                if tile_hor in self.game.map.world_map:
-                    texture_hor = self.game.map.world_map[tile_hor]
+                tile_hor = tile_at(int(x_hor), int(y_hor))
+                if tile_hor:
+                    texture_hor = tile_hor
                     break
                 x_hor += dx
                 y_hor += dy
@@ -71,9 +227,9 @@ class RayCasting:
             dy = delta_depth * sin_a
 
             for i in range(MAX_DEPTH):
-                tile_vert = int(x_vert), int(y_vert)
-                if tile_vert in self.game.map.world_map:
-                    texture_vert = self.game.map.world_map[tile_vert]
+                tile_vert = tile_at(int(x_vert), int(y_vert))
+                if tile_vert:
+                    texture_vert = tile_vert
                     break
                 x_vert += dx
                 y_vert += dy
@@ -90,7 +246,7 @@ class RayCasting:
                 offset = (1 - x_hor) if sin_a > 0 else x_hor
 
             # remove fishbowl effect
-            depth *= math.cos(self.game.player.angle - ray_angle)
+            depth *= math.cos(player.view_angle - ray_angle)
 
             # projection
             proj_height = SCREEN_DIST / (depth + 0.0001)
@@ -100,6 +256,10 @@ class RayCasting:
 
             ray_angle += DELTA_ANGLE
 
+        depth, proj_height, texture, offset = np.array(self.ray_casting_result).T
+        self.ray_casting_arrays = depth, proj_height, texture.astype(np.intp), offset
+        self.depth_buffer = depth
+
     def update(self):
         # Apply screen shake
         if self.game.object_renderer.shake_intensity > 0:
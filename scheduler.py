@@ -0,0 +1,68 @@
+"""
+Level of detail scheduling for npc ai, distant idle npc think less often.
+"""
+import time
+import numpy as np
+from settings import *
+
+
+class AIScheduler:
+    def __init__(self, game):
+        self.game = game
+        self.full_rate_dist = AI_FULL_RATE_DIST
+        self.distant_rate = AI_DISTANT_RATE
+        self.time_budget = AI_TIME_BUDGET / 1000
+        self.cursor = 0
+        self.full_rate_ticks = 0
+        self.distant_ticks = 0
+        self.deferred = 0
+
+    def split(self, state):
+        """Rows of npc that tick every time and rows of the distant idle ones."""
+        alive = state.alive
+        # engaged npc keep their tick by tick timing, a pending shot may hit any npc on screen
+        if self.game.player.shot:
+            full_rate = alive.copy()
+        else:
+            full_rate = alive & (state.player_search_trigger | state.pain | (state.dist < self.full_rate_dist))
+        # dying npc finish their death animation, finished corpses are only drawn
+        full_rate |= ~alive & (state.frame_counter < state.last_death_frame)
+        return np.flatnonzero(full_rate), np.flatnonzero(alive & ~full_rate)
+
+    def get_distant_slice(self, distant):
+        if not len(distant):
+            return distant
+        count = -(-len(distant) // self.distant_rate)
+        return np.roll(distant, -(self.cursor % len(distant)))[:count]
+
+    def update(self, state):
+        # distances and screen positions from the simulated player, drawing projects again from the view
+        player = self.game.player
+        npcs = state.npcs
+        state.project(player.x, player.y, player.angle)
+
+        full_rate, distant = self.split(state)
+        distant = self.get_distant_slice(distant)
+        thinking = np.concatenate((full_rate, distant))
+        self.game.object_handler.update_line_of_sight(thinking[state.alive[thinking]])
+
+        state.check_animation_time(full_rate, self.game.sim_time)
+        for row in full_rate.tolist():
+            npcs[row].run_logic()
+        self.full_rate_ticks += len(full_rate)
+
+        # at least one distant npc ticks per tick so the round robin always moves on
+        deadline = time.perf_counter() + self.time_budget
+        ticked = 0
+        for row in distant.tolist():
+            if ticked and time.perf_counter() > deadline:
+                break
+            npcs[row].tick()
+            ticked += 1
+        self.cursor += ticked
+        self.distant_ticks += ticked
+        self.deferred += len(distant) - ticked
+
+    def stats(self):
+        return {'full_rate_ticks': self.full_rate_ticks, 'distant_ticks': self.distant_ticks,
+                'deferred': self.deferred}
@@ -6,6 +6,10 @@ RES = WIDTH, HEIGHT = 1600, 900
 HALF_WIDTH = WIDTH // 2
 HALF_HEIGHT = HEIGHT // 2
 FPS = 0
+SIM_TICK_RATE = 60  # fixed simulation ticks per second, rendering runs as fast as FPS allows
+SIM_DT = 1000 / SIM_TICK_RATE  # ms of game time per tick
+MAX_CATCH_UP_TICKS = 5  # ticks run per frame at most, the rest of a long stall is dropped
+GLOBAL_TRIGGER_TIME = 40  # ms of game time between global animation triggers
 
 PLAYER_POS = 1.5, 5  # mini_map
 PLAYER_ANGLE = 0
@@ -19,6 +23,8 @@ PLAYER_CROUCH_COLLIDER_SCALE = 0.8
 STAMINA_MAX = 100
 STAMINA_DRAIN_RATE = 0.05  # per ms while sprinting
 STAMINA_RECOVER_RATE = 0.03  # per ms while not sprinting
+MELEE_RANGE = 1.5
+NPC_ATTACK_RADIUS = 6  # furthest any npc attacks from, used to find who hit the player
 
 MOUSE_SENSITIVITY = 0.0003
 MOUSE_MAX_REL = 40
@@ -39,9 +45,50 @@ NUM_RAYS = WIDTH // 2
 HALF_NUM_RAYS = NUM_RAYS // 2
 DELTA_ANGLE = FOV / NUM_RAYS
 MAX_DEPTH = 20
+RAY_CAST_ENGINE = 'numpy'  # 'numpy' or 'python'
 
 SCREEN_DIST = HALF_WIDTH / math.tan(HALF_FOV)
 SCALE = WIDTH // NUM_RAYS
 
 TEXTURE_SIZE = 256
-HALF_TEXTURE_SIZE = TEXTURE_SIZE // 2
\ No newline at end of file
+HALF_TEXTURE_SIZE = TEXTURE_SIZE // 2
+COLUMN_CACHE_MAX_BYTES = 48 * 1024 * 1024  # scaled wall columns kept between frames
+COLUMN_HEIGHT_STEP = 2  # wall column heights are rounded to this many pixels
+SPRITE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # scaled sprite images shared by every sprite
+SPRITE_SIZE_STEP = 4  # scaled sprite sizes are rounded to this many pixels
+PICKUP_IMAGE_SIZE = 128
+PICKUP_RANGE = 0.6
+WALL_RENDERER = 'framebuffer'  # 'framebuffer' or 'blit'
+WALL_COLOR_KEY = (255, 0, 255)  # marks the empty pixels of the framebuffer wall layer
+
+# npc pathfinding
+NPC_PATHFINDING = 'flow_field'  # 'flow_field' or 'path' (a search per npc)
+PATH_ALGORITHM = 'astar'  # 'astar' or 'bfs'
+PATH_CACHE_SIZE = 256  # (start, goal) routes kept until the npc occupancy changes
+
+# npc ai scheduling
+AI_FULL_RATE_DIST = 10  # npc closer than this tick every time, past the 8 tile engage range
+AI_DISTANT_RATE = 4  # idle npc further away tick once every this many simulation ticks
+AI_TIME_BUDGET = 2  # ms per tick for distant npc, near and engaged npc are never deferred
+
+# profiling overlay
+OVERLAY_HISTORY = 120  # frames kept for the rolling averages and the frame time graph
+OVERLAY_GRAPH_MAX_MS = 50  # frame time at the top of the graph
+OVERLAY_BG_COLOR = (0, 0, 0, 170)
+OVERLAY_TEXT_COLOR = (220, 220, 220)
+
+# assets
+ASSET_PACK = 'resources.pack'  # built by pack_assets.py, without it images are decoded from resources/
+ASSET_LOAD_WORKERS = 4  # threads decoding images at start up
+LOADING_CONVERT_BUDGET = 8  # ms per frame converting decoded images on the loading screen
+ASSET_CONVERT_BUDGET = 2  # ms per frame converting images that stream in while playing
+LOADING_BAR_COLOR = (200, 30, 30)
+
+# wave mode
+WAVE_MODE = False  # endless waves instead of one round of npc, also main.py --waves
+WAVE_FIRST_SIZE = 20  # npc in the first wave
+WAVE_GROWTH = 1.5  # each wave is this many times the size of the last
+SPAWN_TIME_BUDGET = 1  # ms per tick spent placing the npc of a wave, at least one is placed per tick
+HEADLESS_SPAWNS_PER_TICK = 8  # headless runs place a fixed number per tick instead, so seeded runs replay alike
+SPAWN_PLAYER_CLEARANCE = 4  # wave npc never spawn within this many tiles of the player
+MAX_CORPSES = 64  # oldest corpses are cleared past this many
@@ -1,4 +1,5 @@
 import pygame as pg
+from assets import assets
 
 
 class Sound:
@@ -6,11 +7,39 @@ class Sound:
         self.game = game
         pg.mixer.init()
         self.path = 'resources/sound/'
-        self.shotgun = pg.mixer.Sound(self.path + 'shotgun.wav')
-        self.npc_pain = pg.mixer.Sound(self.path + 'npc_pain.wav')
-        self.npc_death = pg.mixer.Sound(self.path + 'npc_death.wav')
-        self.npc_shot = pg.mixer.Sound(self.path + 'npc_attack.wav')
+        self.shotgun = self.load('shotgun.wav')
+        self.npc_pain = self.load('npc_pain.wav')
+        self.npc_death = self.load('npc_death.wav')
+        self.npc_shot = self.load('npc_attack.wav')
         self.npc_shot.set_volume(0.2)
-        self.player_pain = pg.mixer.Sound(self.path + 'player_pain.wav')
-        self.theme = pg.mixer.music.load(self.path + 'theme.mp3')
-        pg.mixer.music.set_volume(0.3)
\ No newline at end of file
+        self.player_pain = self.load('player_pain.wav')
+        self.theme = pg.mixer.music.load(assets.open_file(self.path + 'theme.mp3'), 'mp3')
+        pg.mixer.music.set_volume(0.3)
+
+    def load(self, file_name):
+        with assets.open_file(self.path + file_name) as f:
+            return pg.mixer.Sound(file=f)
+
+    def play_theme(self):
+        pg.mixer.music.play(-1)
+
+
+class SilentSound:
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+    def set_volume(self, value):
+        pass
+
+
+class NullSound:
+    """Sound with every effect muted, for running without an audio device."""
+    def __init__(self, game):
+        self.game = game
+        self.shotgun = self.npc_pain = self.npc_death = self.npc_shot = self.player_pain = SilentSound()
+
+    def play_theme(self):
+        pass
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Uniform grid index for proximity queries on npc and pickups.
+"""
+import math
+
+
+class SpatialHash:
+    def __init__(self, cell_size=1):
+        self.cell_size = cell_size
+        # cells hold dicts used as ordered sets, so queries come back in insertion order
+        self.cells = {}
+        self.entity_cells = {}
+
+    def __len__(self):
+        return len(self.entity_cells)
+
+    def __contains__(self, entity):
+        return entity in self.entity_cells
+
+    def cell_of(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, entity):
+        cell = self.cell_of(entity.x, entity.y)
+        self.entity_cells[entity] = cell
+        self.cells.setdefault(cell, {})[entity] = None
+
+    def remove(self, entity):
+        cell = self.entity_cells.pop(entity, None)
+        if cell is not None:
+            entities = self.cells[cell]
+            del entities[entity]
+            if not entities:
+                del self.cells[cell]
+
+    def move(self, entity):
+        """Re-file an entity after it moved, only does work when it crossed into another cell."""
+        cell = self.cell_of(entity.x, entity.y)
+        if self.entity_cells.get(entity) != cell:
+            self.remove(entity)
+            self.entity_cells[entity] = cell
+            self.cells.setdefault(cell, {})[entity] = None
+
+    def clear(self):
+        self.cells.clear()
+        self.entity_cells.clear()
+
+    def query_tile(self, x, y):
+        return list(self.cells.get(self.cell_of(x, y), ()))
+
+    def query_rect(self, left, top, right, bottom):
+        """Entities in every cell touching the rect, not filtered by exact position."""
+        (x0, y0), (x1, y1) = self.cell_of(left, top), self.cell_of(right, bottom)
+        found = []
+        for cell_y in range(y0, y1 + 1):
+            for cell_x in range(x0, x1 + 1):
+                entities = self.cells.get((cell_x, cell_y))
+                if entities:
+                    found.extend(entities)
+        return found
+
+    def query_radius(self, x, y, radius):
+        radius_sq = radius * radius
+        return [entity for entity in self.query_rect(x - radius, y - radius, x + radius, y + radius)
+                if (entity.x - x) ** 2 + (entity.y - y) ** 2 < radius_sq]
+
+    def nearest(self, x, y, radius):
+        best, best_dist_sq = None, math.inf
+        for entity in self.query_radius(x, y, radius):
+            dist_sq = (entity.x - x) ** 2 + (entity.y - y) ** 2
+            if dist_sq < best_dist_sq:
+                best, best_dist_sq = entity, dist_sq
+        return best
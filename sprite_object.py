@@ -1,16 +1,15 @@
 import pygame as pg
 from settings import *
-import os
-from collections import deque
+from cache import sprite_cache
+from assets import assets
 
 
 class SpriteObject:
     def __init__(self, game, path='resources/sprites/static_sprites/candlebra.png',
                  pos=(10.5, 3.5), scale=0.7, shift=0.27):
         self.game = game
-        self.player = game.player
         self.x, self.y = pos
-        self.image = pg.image.load(path).convert_alpha()
+        self.image = assets.load_image(path)
         self.IMAGE_WIDTH = self.image.get_width()
         self.IMAGE_HALF_WIDTH = self.image.get_width() // 2
         self.IMAGE_RATIO = self.IMAGE_WIDTH / self.image.get_height()
@@ -23,22 +22,27 @@ class SpriteObject:
         proj = SCREEN_DIST / self.norm_dist * self.SPRITE_SCALE
         proj_width, proj_height = proj * self.IMAGE_RATIO, proj
 
-        image = pg.transform.scale(self.image, (proj_width, proj_height))
+        image = sprite_cache.get_scaled(self.image, proj_width, proj_height)
 
-        self.sprite_half_width = proj_width // 2
+        self.sprite_half_width = image.get_width() // 2
         height_shift = proj_height * self.SPRITE_HEIGHT_SHIFT
-        pos = self.screen_x - self.sprite_half_width, HALF_HEIGHT - proj_height // 2 + height_shift
+        pos_x, pos_y = int(self.screen_x - self.sprite_half_width), HALF_HEIGHT - image.get_height() // 2 + height_shift
 
-        self.game.raycasting.objects_to_render.append((self.norm_dist, image, pos))
+        # only the columns in front of the walls get drawn
+        raycasting = self.game.raycasting
+        for area in raycasting.get_visible_areas(pos_x, image.get_width(), image.get_height(), self.norm_dist):
+            raycasting.objects_to_render.append((self.norm_dist, image, (pos_x + area.x, pos_y), area))
 
     def get_sprite(self):
-        dx = self.x - self.player.x
-        dy = self.y - self.player.y
+        # projected from the interpolated view of the player
+        player = self.game.player
+        dx = self.x - player.view_x
+        dy = self.y - player.view_y
         self.dx, self.dy = dx, dy
         self.theta = math.atan2(dy, dx)
 
-        delta = self.theta - self.player.angle
-        if (dx > 0 and self.player.angle > math.pi) or (dx < 0 and dy < 0):
+        delta = self.theta - player.view_angle
+        if (dx > 0 and player.view_angle > math.pi) or (dx < 0 and dy < 0):
             delta += math.tau
 
         delta_rays = delta / DELTA_ANGLE
@@ -51,6 +55,10 @@ class SpriteObject:
 
     def update(self):
         self.get_sprite()
+        self.tick()
+
+    def tick(self):
+        pass
 
 
 class AnimatedSprite(SpriteObject):
@@ -60,30 +68,23 @@ class AnimatedSprite(SpriteObject):
         self.animation_time = animation_time
         self.path = path.rsplit('/', 1)[0]
         self.images = self.get_images(self.path)
-        self.animation_time_prev = pg.time.get_ticks()
+        self.animation_time_prev = game.sim_time
         self.animation_trigger = False
 
-    def update(self):
-        super().update()
+    def tick(self):
         self.check_animation_time()
         self.animate(self.images)
 
     def animate(self, images):
         if self.animation_trigger:
-            images.rotate(-1)
-            self.image = images[0]
+            self.image = images.advance()
 
     def check_animation_time(self):
         self.animation_trigger = False
-        time_now = pg.time.get_ticks()
+        time_now = self.game.sim_time
         if time_now - self.animation_time_prev > self.animation_time:
             self.animation_time_prev = time_now
             self.animation_trigger = True
 
     def get_images(self, path):
-        images = deque()
-        for file_name in os.listdir(path):
-            if os.path.isfile(os.path.join(path, file_name)):
-                img = pg.image.load(path + '/' + file_name).convert_alpha()
-                images.append(img)
-        return images
+        return assets.get_frames(path)
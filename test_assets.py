@@ -0,0 +1,40 @@
+import os
+import pygame as pg
+import pytest
+from assets import AssetPack
+from pack_assets import collect, write_pack
+
+
+@pytest.fixture
+def packed_folder(game, tmp_path, monkeypatch):
+    """A pack of two frames in resources/frames, built in a scratch directory."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('resources/frames')
+    for name, color in ('0.png', 'red'), ('1.png', 'blue'):
+        image = pg.Surface((4, 4))
+        image.fill(color)
+        pg.image.save(image, 'resources/frames/' + name)
+    write_pack('test.pack', *collect('resources'))
+    return 'resources/frames'
+
+
+def test_current_pack_keeps_everything(packed_folder):
+    pack = AssetPack('test.pack')
+    assert pack.drop_stale() == []
+    assert packed_folder + '/0.png' in pack and packed_folder in pack.folders
+
+
+def test_edited_file_is_dropped(packed_folder):
+    path = packed_folder + '/0.png'
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    pack = AssetPack('test.pack')
+    assert pack.drop_stale() == [path]
+    assert path not in pack and packed_folder + '/1.png' in pack
+
+
+def test_added_frame_drops_folder_listing(packed_folder):
+    pg.image.save(pg.Surface((4, 4)), packed_folder + '/2.png')
+    pack = AssetPack('test.pack')
+    assert pack.drop_stale() == [packed_folder + '/']
+    assert packed_folder not in pack.folders and packed_folder + '/0.png' in pack
@@ -0,0 +1,90 @@
+import math
+import numpy as np
+from settings import MAX_DEPTH
+
+POSES = 100
+TARGETS = 30
+
+
+def ray_cast_player_npc(game, target_x, target_y):
+    """The scalar dda npc ran one by one before RayCasting.line_of_sight, kept as its reference."""
+    player = game.player
+    npc_x, npc_y = int(target_x), int(target_y)
+    if player.map_pos == (npc_x, npc_y):
+        return True
+
+    wall_dist_v, wall_dist_h = 0, 0
+    player_dist_v, player_dist_h = 0, 0
+
+    is_wall = game.map.is_wall
+    ox, oy = player.pos
+    x_map, y_map = player.map_pos
+
+    ray_angle = math.atan2(target_y - oy, target_x - ox)
+
+    sin_a = math.sin(ray_angle)
+    cos_a = math.cos(ray_angle)
+
+    # horizontals
+    y_hor, dy = (y_map + 1, 1) if sin_a > 0 else (y_map - 1e-6, -1)
+
+    depth_hor = (y_hor - oy) / sin_a
+    x_hor = ox + depth_hor * cos_a
+
+    delta_depth = dy / sin_a
+    dx = delta_depth * cos_a
+
+    for i in range(MAX_DEPTH):
+        tile_x, tile_y = int(x_hor), int(y_hor)
+        if tile_x == npc_x and tile_y == npc_y:
+            player_dist_h = depth_hor
+            break
+        if is_wall(tile_x, tile_y):
+            wall_dist_h = depth_hor
+            break
+        x_hor += dx
+        y_hor += dy
+        depth_hor += delta_depth
+
+    # verticals
+    x_vert, dx = (x_map + 1, 1) if cos_a > 0 else (x_map - 1e-6, -1)
+
+    depth_vert = (x_vert - ox) / cos_a
+    y_vert = oy + depth_vert * sin_a
+
+    delta_depth = dx / cos_a
+    dy = delta_depth * sin_a
+
+    for i in range(MAX_DEPTH):
+        tile_x, tile_y = int(x_vert), int(y_vert)
+        if tile_x == npc_x and tile_y == npc_y:
+            player_dist_v = depth_vert
+            break
+        if is_wall(tile_x, tile_y):
+            wall_dist_v = depth_vert
+            break
+        x_vert += dx
+        y_vert += dy
+        depth_vert += delta_depth
+
+    player_dist = max(player_dist_v, player_dist_h)
+    wall_dist = max(wall_dist_v, wall_dist_h)
+
+    if 0 < player_dist < wall_dist or not wall_dist:
+        return True
+    return False
+
+
+def test_line_of_sight_matches_scalar_ray_cast(game, rng, free_tiles, place_player):
+    outcomes = set()
+    for _ in range(POSES):
+        place_player()
+        targets = [(x + rng.random(), y + rng.random()) for x, y in rng.choices(free_tiles, k=TARGETS)]
+        target_x, target_y = np.array(targets).T
+        visible = game.raycasting.line_of_sight(target_x, target_y)
+
+        assert len(visible) == TARGETS
+        for (x, y), seen in zip(targets, visible):
+            assert bool(seen) == ray_cast_player_npc(game, x, y)
+            outcomes.add(bool(seen))
+    assert outcomes == {True, False}
@@ -0,0 +1,53 @@
+import math
+from heapq import heappop, heappush
+
+QUERIES = 300
+
+
+def test_astar_does_not_cut_wall_corners(game, rng, free_tiles):
+    pathfinding, is_wall = game.pathfinding, game.map.is_wall
+    pathfinding.reset()
+    for _ in range(QUERIES):
+        start, goal = rng.choice(free_tiles), rng.choice(free_tiles)
+        visited = pathfinding.astar(start, goal)
+        for node, prev in visited.items():
+            if prev is None:
+                continue
+            dx, dy = node[0] - prev[0], node[1] - prev[1]
+            assert max(abs(dx), abs(dy)) == 1
+            assert not is_wall(*node)
+            if dx and dy:
+                assert not is_wall(prev[0] + dx, prev[1]) and not is_wall(prev[0], prev[1] + dy)
+
+
+def shortest_costs(graph, start):
+    """Reference Dijkstra over the weighted graph."""
+    costs, queue = {start: 0}, [(0, start)]
+    while queue:
+        cost, node = heappop(queue)
+        if cost > costs[node]:
+            continue
+        for next_node, move_cost in graph[node]:
+            next_cost = cost + move_cost
+            if next_cost < costs.get(next_node, math.inf):
+                costs[next_node] = next_cost
+                heappush(queue, (next_cost, next_node))
+    return costs
+
+
+def test_astar_finds_shortest_paths(game, rng, free_tiles):
+    pathfinding = game.pathfinding
+    pathfinding.reset()
+    for _ in range(QUERIES // 10):
+        start = rng.choice(free_tiles)
+        costs = shortest_costs(pathfinding.weighted_graph, start)
+        for goal in rng.sample(free_tiles, 10):
+            visited = pathfinding.astar(start, goal)
+            assert (goal in visited) == (goal in costs)
+            if goal not in costs:
+                continue
+            length, node = 0, goal
+            while visited[node] is not None:
+                length += math.dist(node, visited[node])
+                node = visited[node]
+            assert math.isclose(length, costs[goal], abs_tol=1e-9)
@@ -0,0 +1,38 @@
+import pytest
+from pickups import PickupHandler
+from settings import PLAYER_MAX_HEALTH
+
+
+@pytest.fixture
+def pickup_handler(game):
+    handler = PickupHandler(game)
+    yield handler
+    for pickup in handler.pickups[::-1]:
+        handler.release(pickup)
+
+
+def test_pickups_are_indexed_by_tile(game, pickup_handler):
+    index = game.object_handler.pickup_index
+    assert len(index) == len(pickup_handler.pickups)
+    for pickup in pickup_handler.pickups:
+        assert pickup in pickup_handler.get_pickups_at(pickup.x, pickup.y)
+
+
+def test_collected_pickups_are_pooled_and_placed_again(game, pickup_handler):
+    index, player = game.object_handler.pickup_index, game.player
+    pickups = list(pickup_handler.pickups)
+    health = next(pickup for pickup in pickups if pickup.type == 'health')
+    player.health = 10
+    player.x, player.y = health.x, health.y
+    pickup_handler.update()
+
+    assert player.health == min(PLAYER_MAX_HEALTH, 10 + health.value)
+    assert health.collected and health not in index
+    assert health not in pickup_handler.pickups and pickup_handler.pool['health'] == [health]
+    assert not pickup_handler.get_pickups_at(health.x, health.y)
+
+    pickup_handler.reset()
+    # the same objects come back out of the pool, nothing is built anew
+    assert set(pickup_handler.pickups) == set(pickups)
+    assert not any(pickup.collected for pickup in pickup_handler.pickups)
+    assert len(index) == len(pickups) and not any(pickup_handler.pool.values())
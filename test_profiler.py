@@ -0,0 +1,48 @@
+import pygame as pg
+from profiler import StageProfiler
+from profiler_overlay import SURFACE_FACTORIES
+
+
+def count_surfaces(profiler):
+    profiler.count_instances(pg, 'Surface', 'surfaces')
+    for module, name, when in SURFACE_FACTORIES:
+        profiler.count(module, name, 'surfaces', when)
+
+
+def test_scaling_into_a_destination_is_not_counted(game):
+    profiler = StageProfiler()
+    count_surfaces(profiler)
+    try:
+        source, dest = pg.Surface((8, 8)), pg.Surface((16, 16))
+        pg.transform.scale(source, (16, 16), dest)
+        pg.transform.scale(source, (16, 16), dest_surface=dest)
+        pg.transform.scale(source, (4, 4))
+        pg.transform.flip(source, True, False)
+        assert profiler.end_frame()[1] == {'surfaces': 4}
+    finally:
+        profiler.uninstrument()
+
+
+def test_counted_surface_is_still_a_surface(game):
+    profiler = StageProfiler()
+    count_surfaces(profiler)
+    try:
+        made_here, made_by_pygame = pg.Surface((2, 2)), pg.transform.scale(pg.Surface((2, 2)), (4, 4))
+        assert isinstance(made_here, pg.Surface) and isinstance(made_by_pygame, pg.Surface)
+        assert issubclass(type(made_by_pygame), pg.Surface)
+    finally:
+        profiler.uninstrument()
+    assert isinstance(made_here, pg.Surface)
+
+
+def test_overlay_counts_no_surfaces_for_the_framebuffer_renderer(game):
+    overlay = game.overlay
+    overlay.toggle()
+    try:
+        for _ in range(3):
+            game.update()
+            game.draw()
+            overlay.end_frame()
+        assert overlay.counts.get('surfaces', 0) == 0
+    finally:
+        overlay.toggle()
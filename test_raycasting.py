@@ -0,0 +1,22 @@
+import math
+
+POSES = 200
+
+
+def test_numpy_matches_python(game, place_player):
+    ray_casting = game.raycasting
+    for _ in range(POSES):
+        place_player()
+        ray_casting.ray_cast_python()
+        expected = ray_casting.ray_casting_result
+        ray_casting.ray_cast_numpy()
+        result = ray_casting.ray_casting_result
+
+        assert len(result) == len(expected)
+        for (depth, proj_height, texture, offset), (exp_depth, exp_height, exp_texture, exp_offset) in zip(
+                result, expected):
+            assert texture == exp_texture
+            assert math.isclose(depth, exp_depth, rel_tol=1e-9)
+            assert math.isclose(proj_height, exp_height, rel_tol=1e-9)
+            # an offset right on a tile edge can land on either side of it
+            assert min(abs(offset - exp_offset), 1 - abs(offset - exp_offset)) < 1e-6
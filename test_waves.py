@@ -0,0 +1,25 @@
+import random
+import object_handler
+from main import Game
+
+TICKS = 120
+
+
+def seeded_wave_run():
+    random.seed(1)
+    game = Game(headless=True, wave_mode=True)
+    player = game.player
+    for tick in range(TICKS):
+        # keep the player moving so the spawn clearance changes from tick to tick
+        player.x, player.y = 3.5 + tick % 6, 6.5
+        game.update()
+    return [(type(npc).__name__, npc.x, npc.y, npc.attack_dist) for npc in game.object_handler.npc_list]
+
+
+def test_headless_wave_spawns_do_not_depend_on_timing(game, monkeypatch):
+    expected = seeded_wave_run()
+    # every placement overruns the time budget, as on a slow or loaded machine
+    clock = iter(range(0, 10 ** 9, 10))
+    monkeypatch.setattr(object_handler.time, 'perf_counter', lambda: next(clock))
+    assert seeded_wave_run() == expected
+    assert len(expected) == object_handler.WAVE_FIRST_SIZE
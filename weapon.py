@@ -1,4 +1,5 @@
 from sprite_object import *
+from collections import deque
 
 
 class Weapon(AnimatedSprite):
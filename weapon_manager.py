@@ -4,6 +4,7 @@ Weapon system with multiple weapons and switching.
 import pygame as pg
 from collections import deque
 from settings import *
+from assets import assets
 
 
 class WeaponManager:
@@ -16,6 +17,11 @@ class WeaponManager:
         }
         self.current_weapon_id = 2  # Start with shotgun
         self.current_weapon = self.weapons[self.current_weapon_id]
+
+    def reset(self):
+        for weapon in self.weapons.values():
+            weapon.reset()
+        self.switch_weapon(2)
     
     def switch_weapon(self, weapon_id):
         if weapon_id in self.weapons:
@@ -38,14 +44,14 @@ class WeaponBase:
         self.damage = damage
         self.ammo_per_shot = ammo_per_shot
         
-        self.image = pg.image.load(path).convert_alpha()
+        self.image = assets.load_image(path)
         self.images = deque([pg.transform.smoothscale(self.image, (self.image.get_width() * scale, 
                                                                      self.image.get_height() * scale))])
         self.weapon_pos = (HALF_WIDTH - self.images[0].get_width() // 2, HEIGHT - self.images[0].get_height())
         self.reloading = False
         self.num_images = len(self.images)
         self.frame_counter = 0
-        self.animation_time_prev = pg.time.get_ticks()
+        self.animation_time_prev = game.sim_time
         self.animation_trigger = False
     
     def animate_shot(self):
@@ -61,6 +67,14 @@ class WeaponBase:
     
     def draw(self):
         self.game.screen.blit(self.images[0], self.weapon_pos)
+
+    def reset(self):
+        # a reload in progress has rotated the frames frame_counter times
+        self.images.rotate(self.frame_counter)
+        self.reloading = False
+        self.frame_counter = 0
+        self.animation_time_prev = self.game.sim_time
+        self.animation_trigger = False
     
     def update(self):
         self.check_animation_time()
@@ -68,7 +82,7 @@ class WeaponBase:
     
     def check_animation_time(self):
         self.animation_trigger = False
-        time_now = pg.time.get_ticks()
+        time_now = self.game.sim_time
         if time_now - self.animation_time_prev > self.animation_time:
             self.animation_time_prev = time_now
             self.animation_trigger = True
@@ -101,7 +115,7 @@ class Shotgun(WeaponBase):
         images = []
         for i in range(20):
             try:
-                img = pg.image.load(f'resources/sprites/weapon/shotgun/{i}.png').convert_alpha()
+                img = assets.load_image(f'resources/sprites/weapon/shotgun/{i}.png')
                 images.append(img)
             except:
                 break